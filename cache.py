@@ -0,0 +1,74 @@
+# cache.py
+import threading
+from cachetools import TTLCache
+from config import CONFIG
+
+
+class ChatCache:
+    """
+    Time-limited cache of data fetched from the Returns server app per client chat.
+
+    The bot and the FastAPI app run on different threads and both change balances,
+    so the cache is shared through this module and every access holds a lock.
+
+    Methods:
+        get(chat_id): Returns the cached value of chat_id, or None.
+        set(chat_id, value): Caches value for chat_id.
+        invalidate(chat_id=None): Removes the cached value of chat_id, or all cached values.
+    """
+
+    def __init__(self, ttl, maxsize=10000):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, chat_id):
+        """
+        Returns the cached value of chat_id, None if it is not cached or expired.
+
+        Args:
+            chat_id (int): The ID of the client chat.
+        """
+        with self._lock:
+            return self._cache.get(int(chat_id))
+
+    def set(self, chat_id, value):
+        """
+        Caches value for chat_id.
+
+        Args:
+            chat_id (int): The ID of the client chat.
+            value: The value to cache.
+        """
+        with self._lock:
+            self._cache[int(chat_id)] = value
+
+    def invalidate(self, chat_id=None):
+        """
+        Removes the cached value of chat_id after a balance changing event, or all cached values if chat_id is None.
+
+        Args:
+            chat_id (int, optional): The ID of the client chat.
+        """
+        with self._lock:
+            if chat_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(int(chat_id), None)
+
+
+# balances fetched from the Returns server app: {chat_id: (balance, firstname, lastname, currency)}
+balance_cache = ChatCache(ttl=CONFIG.BALANCE_CACHE_TTL)
+
+# client details fetched from the Returns server app: {chat_id: client}
+client_cache = ChatCache(ttl=CONFIG.CLIENT_CACHE_TTL)
+
+
+def invalidate_client(chat_id):
+    """
+    Removes the cached balance and client details of chat_id, after its balance changed.
+
+    Args:
+        chat_id (int): The ID of the client chat.
+    """
+    balance_cache.invalidate(chat_id)
+    client_cache.invalidate(chat_id)
@@ -4,6 +4,8 @@ class Client:
     """
     Represents a client with associated attributes and methods.
     """
+    # fixed attribute set without a per-instance __dict__, one Client is kept in memory per user
+    __slots__ = ('chat_id', 'firstname', 'lastname', 'lang', 'balance', 'status', 'active_deposit_address')
 
     def __init__(self, chat_id, firstname, lastname, lang, status: dict) -> None:
         """
@@ -68,3 +70,4 @@ class Client:
         - str: String representation containing chat_id, firstname, lastname, and lang.
         """
         return f"Client(chat_id={self.chat_id}, firstname='{self.firstname}', lastname='{self.lastname}', lang='{self.lang}')"
+
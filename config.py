@@ -21,6 +21,15 @@ class CONFIG:
     ONGOING_DEPOSIT_REQUEST_NOTIFICATION_INTERVAL = 60 # notifies client every x seconds about the remaining time of DEPOSIT_ADD_VALIDITY
     DEPOSIT_MINIMUM = 20 # If below the deposit minimum, the deposit receipt confirmation will ask the customer to top up the difference.
     MAX_DEPOSIT_ADDRESSES = 10 # maximum number of deposit addresses that can be used concurrently
+    MAX_KNOWN_DEPOSIT_REF_IDS = 10000 # number of processed deposit refids kept in memory to skip them on later polls
+    CONCURRENT_UPDATES = 32 # maximum number of Telegram updates the bot processes at the same time
+    CLIENT_CACHE_TTL = 30 # number of seconds client details fetched from the Returns server app are cached
+    BALANCE_CACHE_TTL = 30 # number of seconds balances fetched from the Returns server app are cached
+    DEPOSIT_ADDR_RESERVATION_TTL = 3600 # number of seconds a deposit address shown to a client stays reserved for that client
+    DEPOSIT_ADDR_CACHE_TTL = 60 # number of seconds the list of deposit addresses read from the database is cached
+    CENTRAL_ADDR_CACHE_TTL = 60 # number of seconds the central address read from the database is cached
+    PRIVATE_KEY_CACHE_TTL = 300 # number of seconds the private key of a deposit address read from the database is cached
+    TOTAL_LIABILITIES_CACHE_TTL = 60 # number of seconds the total liabilities read from the database are cached
     LOGO_PATH = 'assets/algoeagle_dark_logo_flat.jpg'
     ENDPOINT_BASEURL = 'http://localhost:5001/api'
     RETURNS_BASEURL = 'http://localhost:5010/api'
@@ -37,11 +46,15 @@ class CONFIG:
 
     class ETHPOLYGON:
         USDT_CONTRACT = '0xc2132D05D31c914a87C6611C10748AEb04B58e8F'
+        CHAIN_ID = 137 # polygon mainnet chain id
         BACKUP_CENTRAL_ADDRESS =  '0x92ed6e3488C3722225FC7a3276436e0F55c7194b' # is used if db request get_central address returns null
         BALANCEOF_FUNCTION = '0x70a08231'
         GET_BALANCE_BATCH_SIZE = 10 # currently infura supports a maximum batch size of 9
         INCREASE_GAS_PRICE_PERCENTAGE = 10 # 20% is aggressive, 10% often enough to get prioritized transaction
         RETROSPECT_BLOCKS = 480 # 35000 original value | how many blocks into the past to search for new transactions
+        TRANSFER_CONCURRENCY = 4 # maximum number of deposit-to-central transfers running at the same time
+        RECEIPT_TIMEOUT = 300 # seconds to wait for the receipt of a transfer transaction
+        RECEIPT_POLL_LATENCY = 2 # seconds between the checks for the receipt of a transfer transaction
 
     class API:
         INFURA_API_URL = 'https://polygon-mainnet.infura.io/v3/'
@@ -52,13 +65,29 @@ class CONFIG:
         GET_DEPOSIT_ADRESSES_EP = "/0/private/DepositAddresses"
         GET_DEPOSIT_METHODS_EP = "/0/private/DepositMethods"
         GET_DEPOSIT_STATUS_EP = "/0/private/DepositStatus"
+        CONNECT_TIMEOUT = 3.05 # seconds to establish a connection to the Kraken API
+        READ_TIMEOUT = 10 # seconds to wait for a Kraken API response
     
+    class HTTP:
+        TIMEOUT = 10 # total timeout in seconds for outgoing HTTP requests
+        CONNECT_TIMEOUT = 2 # seconds to establish a connection, a service that is down fails fast instead of after TIMEOUT
+        MAX_CONNECTIONS_PER_HOST = 32 # size of the keep-alive connection pool per host
+
     class DBCONFIG:
         DBNAME = 'OrcaClient'
         USER = 'orcauser'
         PASSWORD = 'txm9272'
         HOST = 'psql15.hq.rvg'
         PORT = '5432'
+        SOCKET_DIR = '/var/run/postgresql'  # Unix socket directory used instead of TCP when HOST is localhost
+        POOL_MINCONN = 2   # connections kept open in the DataHandler connection pool
+        POOL_MAXCONN = 20  # upper limit of connections the pool hands out at the same time
+        BULK_PAGE_SIZE = 500  # rows per INSERT statement for bulk inserts
+        STATEMENT_ITERSIZE = 1000  # rows fetched at a time when streaming a client statement
+        COPY_BUFFER_SIZE = 1024 * 1024  # bytes sent to the database per chunk when streaming a CSV file with COPY
+        STATEMENT_TIMEOUT = '15s'  # queries running longer than this are cancelled by the database
+        IDLE_IN_TRANSACTION_TIMEOUT = '30s'  # sessions idling in an open transaction longer than this are terminated
+        LOCK_TIMEOUT = '5s'  # statements waiting longer than this for a lock are cancelled
 
     class RETURNS_API:
         APPSERVER_URL = "http://localhost:5010"
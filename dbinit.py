@@ -53,6 +53,8 @@ class DBInit:
         self.execute_script(self.create_import_csv_data())
         self.execute_script(self.create_add_deposit_record())
         self.execute_script(self.create_check_if_deposit_processed())
+        self.execute_script(self.create_get_processed_deposits())
+        self.execute_script(self.create_record_deposit())
 
 
 
@@ -394,6 +396,7 @@ class DBInit:
         Returns all depositlogs where 'transferred' is false. This means, these are the transactions
         from clients depositing money on one of the deposit-accounts which haven't been transferred yet
         to the central account.
+        Addresses and transaction IDs are stored enclosed in single quotes, the quotes are trimmed here.
         """
         return """
         CREATE OR REPLACE FUNCTION get_newdepositlogs()
@@ -413,9 +416,9 @@ class DBInit:
             RETURN QUERY
             SELECT 
                 d.id,
-                d.from_address,
-                d.to_address,
-                d.transaction_id,
+                btrim(d.from_address, '''')::VARCHAR,
+                btrim(d.to_address, '''')::VARCHAR,
+                btrim(d.transaction_id, '''')::VARCHAR,
                 d.block_number,
                 d.block_timestamp,
                 d.amount,
@@ -657,6 +660,91 @@ class DBInit:
         """
 
 
+    @staticmethod
+    def create_get_processed_deposits():
+        """Returns SQL query string to create a stored function that checks several deposits at once.
+
+        This static method generates an SQL query string that defines a stored function
+        `get_processed_deposits` in PL/pgSQL language. The function returns the reference IDs
+        of `p_refids` that exist in the 'deposits' table, so a batch of deposits is checked
+        with one query instead of one check_if_deposit_processed call per deposit.
+
+        Args:
+            p_refids (list of str): Unique identifiers of the deposit transactions to check.
+
+        Returns:
+            str: SQL query string to create the stored function.
+        """
+        return """
+        CREATE OR REPLACE FUNCTION get_processed_deposits(p_refids VARCHAR[])
+        RETURNS TABLE(refid VARCHAR) AS $$
+        BEGIN
+            -- Acquire the advisory lock
+            PERFORM pg_advisory_lock(12345); -- Same lock code as check_if_deposit_processed
+
+            RETURN QUERY
+            SELECT d.refid
+            FROM deposits d
+            WHERE d.refid = ANY(p_refids);
+
+            -- Release the advisory lock
+            PERFORM pg_advisory_unlock(12345);
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+
+
+    @staticmethod
+    def create_record_deposit():
+        """Returns SQL query string to create a stored function that records a deposit only once.
+
+        This static method generates an SQL query string that defines a stored function
+        `record_deposit` in PL/pgSQL language. The function inserts the deposit record into
+        the 'deposits' table unless a record with the same reference ID exists, and tells the
+        caller whether it did. Checking and inserting happen in one atomic statement, so a
+        deposit can't be recorded (and credited) twice by concurrent callers.
+
+        Args:
+            p_refid (str): Unique identifier of the deposit transaction.
+            p_chat_id (int): Telegram chat ID of the client.
+            p_firstname (str): First name of the client.
+            p_lastname (str): Last name of the client.
+            p_amount (float): Amount deposited.
+            p_asset (str): Asset type of the deposit.
+            p_txid (str): Transaction ID of the deposit.
+            p_deposit_address (str): Deposit address used for the transaction.
+
+        Returns:
+            str: SQL query string to create the stored function.
+        """
+        return """
+        CREATE OR REPLACE FUNCTION record_deposit(
+            p_refid VARCHAR(100),
+            p_chat_id BIGINT,
+            p_firstname VARCHAR(100),
+            p_lastname VARCHAR(100),
+            p_amount NUMERIC(20, 6),
+            p_asset VARCHAR(50),
+            p_txid VARCHAR(100),
+            p_deposit_address VARCHAR(100)
+        )
+        RETURNS BOOLEAN AS $$
+        DECLARE
+            v_inserted_refid VARCHAR(100);
+        BEGIN
+            -- insert the new record unless the deposit has already been recorded
+            INSERT INTO deposits (refid, chat_id, firstname, lastname, amount, asset, txid, deposit_address, time)
+            VALUES (p_refid, p_chat_id, p_firstname, p_lastname, p_amount, p_asset, p_txid, p_deposit_address, CURRENT_TIMESTAMP)
+            ON CONFLICT (refid) DO NOTHING
+            RETURNING refid INTO v_inserted_refid;
+
+            -- true if this call recorded the deposit, false if it was recorded before
+            RETURN v_inserted_refid IS NOT NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+
+
 
 
 # this script must be excuted to initialize database.
@@ -8,7 +8,12 @@ import requests
 from web3 import Web3
 from config import CONFIG
 import datetime
+from decimal import Decimal
 from model import DataHandler
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 
@@ -63,7 +68,7 @@ class DepositLogs:
         
         # Convert bytes to hex string and then to integer
         data_hex = binascii.hexlify(event['data']).decode('utf-8')
-        amount = int(data_hex, 16) / (10 ** 6)  # Adjust for USDT's decimals
+        amount = Decimal(int(data_hex, 16)).scaleb(-6)  # Adjust for USDT's decimals, exact unlike a float division
 
         # fetch timestamp of block (only blocks have timestamp, not individual transactions inside the block)
         # block = web3.eth.get_block(block_number)
@@ -83,7 +88,7 @@ class DepositLogs:
             'transaction_id': str(transaction_hash),
             'block_number': int(block_number),
             'block_timestamp': transaction_date,
-            'amount': float(amount)
+            'amount': amount
         }
         return log
 
@@ -147,29 +152,29 @@ class DepositLogs:
         batch_size = CONFIG.ETHPOLYGON.GET_BALANCE_BATCH_SIZE
         batches = [wallet_addresses_padded[i:i + batch_size] for i in range(0, len(wallet_addresses_padded), batch_size)]
 
-        database = DataHandler()
-        for batch in batches:
-            logs = None
-            try:
-                # Query logs for the current batch of wallet addresses
-                logs = self.web3.eth.get_logs({
-                    'address': self.contract_address,
-                    'fromBlock': startblock,
-                    'toBlock': latest_block,
-                    'topics': [self.transfer_event_signature, None, batch]  # Use batch of addresses
-                })
-            except Exception as e:
-                print(f"Error while fetching transaction logs for batch: {e}")
-
-            # Process the logs
-            if logs:
-                for log in logs:
-                    row = self.handle_event(log)
-                    if row:
-                        result.append(row)
-
-                # Insert logs into the database after each batch
-                database.insert_depositlogs(result)  # Insert new logs into the depositlog table
+        with DataHandler() as database:
+            for batch in batches:
+                logs = None
+                try:
+                    # Query logs for the current batch of wallet addresses
+                    logs = self.web3.eth.get_logs({
+                        'address': self.contract_address,
+                        'fromBlock': startblock,
+                        'toBlock': latest_block,
+                        'topics': [self.transfer_event_signature, None, batch]  # Use batch of addresses
+                    })
+                except Exception as e:
+                    logger.error(f"Error while fetching transaction logs for batch: {e}")
+
+                # Process the logs
+                if logs:
+                    for log in logs:
+                        row = self.handle_event(log)
+                        if row:
+                            result.append(row)
+
+                    # Insert logs into the database after each batch
+                    database.insert_depositlogs(result)  # Insert new logs into the depositlog table
 
         return result
 
@@ -1,20 +1,34 @@
 # depositstack.py
+import asyncio
+import json
 import re
 import sys
+from collections import deque
 from datetime import datetime, timedelta
 import requests
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 import telegram
 from telegram import Update, Bot
 from telegram.ext import Updater, CommandHandler, MessageHandler, filters
 from client import Client
 from config import CONFIG
 from model import DataHandler
+from cache import invalidate_client
 import logging
 
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:  # fall back to the standard json module
+    orjson = None
+
+# JSON decoder for API responses
+json_loads = orjson.loads if orjson else json.loads
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
 
 
 class DepositStack():
@@ -68,15 +82,16 @@ class DepositStack():
             self.deposit_addresses = [depositaddresses_recordset[i]['depositaddress'] for i in range(CONFIG.MAX_DEPOSIT_ADDRESSES)]
             self.stacks = [[] for _ in range(CONFIG.MAX_DEPOSIT_ADDRESSES)]
             self.deposit_ref_ids = set()  # set more efficient than list in 'in' comparisons
+            self.deposit_ref_id_order = deque()  # insertion order of deposit_ref_ids, oldest are dropped first
 
         except ValueError as e:
             # Handle ValueError related to MAX_DEPOSIT_ADDRESSES
-            print(f"ValueError in __init__: {e}")
+            logger.error(f"ValueError in __init__: {e}")
             sys.exit(1)
 
         except Exception as e:
             # Handle any unexpected errors during initialization
-            print(f"Unexpected error in __init__: {e}")
+            logger.error(f"Unexpected error in __init__: {e}")
             sys.exit(1)
 
 
@@ -122,7 +137,7 @@ class DepositStack():
                 etd = etd_timestamp.isoformat()
 
             # Create deposit request dictionary
-            print(f"\n\n\n\n\n~~~~~~~~~~~~~~~~~~~~~~\n\ndeposit_request eta: {eta}\n~~~~~~~~~~~~~~~~~~~~~~\n\n\n\n\n")
+            logger.debug("deposit_request eta: %s", eta)
             deposit_request = {
                 'timestamp': timestamp,
                 'etd': etd, # estimated start time (estimated time of departure) - start time of deposit time window
@@ -299,7 +314,9 @@ class DepositStack():
         
         try:
             deposits = response_data
-            
+
+            # check all deposits of this batch against the database with one query
+            processed_refids = await asyncio.to_thread(self.database.get_processed_deposits, [deposit['refid'] for deposit in deposits])
 
             for deposit in deposits:
                 deposit_address = deposit['deposit_address']
@@ -309,8 +326,9 @@ class DepositStack():
                 refid = deposit['refid']  # Unique identifier of the deposit transaction
                 credit_time =datetime.now()
                 
-                # Check if the deposit has already been processed
-                if self.database.check_if_deposit_processed(refid):
+                # Check if the deposit has already been processed, one by one if the batch check failed
+                if (refid in processed_refids) if processed_refids is not None else await asyncio.to_thread(self.database.check_if_deposit_processed, refid):
+                    self.remember_deposit_ref_id(refid)  # known from now on, no need to ask the database again
                     continue # jump to next item in deposits and don't process the current one cos it's already processed
                 
                 # Iterate through each stack to find matching deposit requests
@@ -319,7 +337,7 @@ class DepositStack():
                         # Convert request['eta'] from ISO string to a datetime object
                         etd_datetime = datetime.fromisoformat(request['etd'])
                         eta_datetime = datetime.fromisoformat(request['eta'])
-                        print(f"eta_datetime {etd_datetime} <= credit_time {credit_time}\nand eta_datetime {eta_datetime} >= credit_time {credit_time}")
+                        logger.debug("etd_datetime %s <= credit_time %s and eta_datetime %s >= credit_time %s", etd_datetime, credit_time, eta_datetime, credit_time)
                         if request['deposit_address'] == deposit_address and request['sent_to_client'] and etd_datetime <= credit_time and eta_datetime >= credit_time:
                             client_obj: Client = request['client_obj']
                             first_name = client_obj.firstname
@@ -336,8 +354,16 @@ class DepositStack():
                             if last_name == None:
                                 last_name = ""
                             
-                            # Add deposit record to the database to prevent re-processing
-                            self.database.add_deposit_record(refid, chat_id, first_name, last_name, amount, asset, txid, deposit_address)
+                            # Add deposit record to the database to prevent re-processing, only credit if it was recorded now
+                            recorded = await asyncio.to_thread(self.database.record_deposit, refid, chat_id, first_name, last_name, amount, asset, txid, deposit_address)
+                            if recorded is False:
+                                logger.info(f"Deposit {refid} has already been recorded, not crediting it again")
+                                self.remember_deposit_ref_id(refid)
+                                break
+                            if recorded is not True:
+                                # the database call failed, don't credit and leave the deposit for a later poll
+                                logger.error(f"Deposit {refid} could not be recorded, not crediting it now and retrying on a later poll")
+                                break
                             # inform communit on group chat about someone just made an investment deposit
                             if first_name != "" and first_name is not None:
                                 if len(first_name) > 1:
@@ -348,7 +374,8 @@ class DepositStack():
                                 notification_username = "default_username"
 
                     
-                            self.database.send_deposit_notification(username=notification_username, deposit_amount=amount)
+                            # the group notification doesn't depend on crediting the deposit, send it while the deposit is being credited
+                            notification_task = asyncio.create_task(asyncio.to_thread(self.database.send_deposit_notification, username=notification_username, deposit_amount=amount))
 ############################ UPDATE CLIENT BALANCES REMOTE PROCEDURE CALL ##################################################
                             # Update client balances and create ledger entry 
                             # Prepare data to send in the API request
@@ -374,11 +401,13 @@ class DepositStack():
                             }
 
                             try:
-                                # Make the API call to handle the deposit
-                                response = requests.post(f"{CONFIG.RETURNS_API.APPSERVER_URL}{CONFIG.RETURNS_API.HANDLE_DEPOSIT}", json=payload)
+                                # Make the API call to handle the deposit, the body is serialized with orjson if it is installed
+                                body = orjson.dumps(payload) if orjson else json.dumps(payload).encode('utf-8')
+                                response = await asyncio.to_thread(requests.post, f"{CONFIG.RETURNS_API.APPSERVER_URL}{CONFIG.RETURNS_API.HANDLE_DEPOSIT}", data=body, headers=JSON_HEADERS)
                                 response.raise_for_status()  # Raise an exception for HTTP errors
-                                result = response.json()
+                                result = json_loads(response.content)
                                 logger.info(f"Deposit handled successfully: {result}")
+                                invalidate_client(chat_id)  # the credited deposit changed the balance
   
                             except requests.HTTPError as e:
                                 # Log the HTTP error
@@ -395,20 +424,18 @@ class DepositStack():
                             except Exception as e:
                                 logger.error(f"Error occurred while calling handle_deposit API: {e}")
 
+                            await notification_task
+
 #############################################################################################################################
 
 
                             # Notify client about the deposit confirmation
                             # Construct message for deposit confirmation
-                            print("\n\n\n***************************************************")
-                            print("***************************************************\n\n\n")
-                            print("self.database.get_total_deposits_client next!")
-                            print("chat_id:", chat_id, "\n\n")
-
-                            print("***************************************************\n\n\n")
-                            total_deposit_amount = self.database.get_total_deposits_client(p_chat_id=int(chat_id))
-                            gross_total_deposit_amount = total_deposit_amount / (100 - CONFIG.FEES.DEPOSIT_FEE) * 100
-                            print("gross_total_deposit_amount: ", gross_total_deposit_amount)
+                            logger.debug("get_total_deposits_client for chat_id: %s", chat_id)
+                            total_deposit_amount = await asyncio.to_thread(self.database.get_total_deposits_client, p_chat_id=int(chat_id))
+                            # the total is a Decimal, rounded to the USDT precision for display
+                            gross_total_deposit_amount = (total_deposit_amount / (100 - CONFIG.FEES.DEPOSIT_FEE) * 100).quantize(Decimal('0.000001'), rounding=ROUND_HALF_UP)
+                            logger.debug("gross_total_deposit_amount: %s", gross_total_deposit_amount)
                             if gross_total_deposit_amount < (CONFIG.DEPOSIT_MINIMUM * 0.97):     # tolerance of 3% (100-97 = 3)
                                 difference = CONFIG.DEPOSIT_MINIMUM - gross_total_deposit_amount
                                 top_up_warning = f"\n\n❗ WARNING: The minimum deposit is USDT {CONFIG.DEPOSIT_MINIMUM}, but your deposit total is USDT {gross_total_deposit_amount}. Please add USDT {difference} to meet the minimum required for your investment to generate returns. You can make an additional deposit using the /deposit command."
@@ -416,7 +443,7 @@ class DepositStack():
                                 top_up_warning = ""
 
                             if referral:
-                                print(f"depositstack.py - receive_deposit() - referral: {referral}")
+                                logger.debug("receive_deposit() - referral: %s", referral)
                                 if not referral.startswith('!bonuscode?'):
                                     savings = amount * (CONFIG.FEES.REFEREE_DEPOSIT_FEE_DISCOUNT / 100)
                                     message = (
@@ -431,9 +458,9 @@ class DepositStack():
                                         f"{top_up_warning}"
                                     )
                                     bonus_to_referrer = amount / 100 * CONFIG.FEES.REFERRER_KICKBACK     
-                                    referrer_chat_id = self.database.validate_referral(referral)
+                                    referrer_chat_id = await asyncio.to_thread(self.database.validate_referral, referral)
                                     try:
-                                        self.database.handle_referral_bonus(p_chat_id=referrer_chat_id, p_bonus_amount=bonus_to_referrer)
+                                        await asyncio.to_thread(self.database.handle_referral_bonus, p_chat_id=referrer_chat_id, p_bonus_amount=bonus_to_referrer)
                                     except Exception as e:
                                         logger.error(f"receive_deposit() - error in calling handle_referral_bonus: {e}")
                                     message_to_referrer = (
@@ -510,7 +537,7 @@ class DepositStack():
                                         logger.error(error_message)
 
                             # Add refid to known refids to avoid processing it again
-                            self.deposit_ref_ids.add(refid)
+                            self.remember_deposit_ref_id(refid)
                             
                             # Remove the processed request from the stack
                             stack.pop(i)
@@ -521,6 +548,19 @@ class DepositStack():
             
     
 
+    def is_known_deposit(self, refid) -> bool:
+        """Return True if the deposit with refid has already been processed."""
+        return refid in self.deposit_ref_ids
+
+    def remember_deposit_ref_id(self, refid):
+        """Add refid to the processed deposits, dropping the oldest once CONFIG.MAX_KNOWN_DEPOSIT_REF_IDS are kept."""
+        if refid in self.deposit_ref_ids:
+            return
+        if len(self.deposit_ref_id_order) >= CONFIG.MAX_KNOWN_DEPOSIT_REF_IDS:
+            self.deposit_ref_ids.discard(self.deposit_ref_id_order.popleft())
+        self.deposit_ref_ids.add(refid)
+        self.deposit_ref_id_order.append(refid)
+
     def smart_concat(self, str1, str2):
         if str1 and str2:
             return f"{str1} {str2}"
@@ -2,7 +2,7 @@
 
 # Import necessary modules from FastAPI and Pydantic
 from telegram.ext import Application
-import requests
+import asyncio
 from fastapi import FastAPI, HTTPException, Body
 from pydantic import BaseModel
 from config import CONFIG
@@ -12,6 +12,7 @@ from datetime import datetime
 
 # Import custom modules or classes
 from model import DataHandler
+from cache import invalidate_client
 
 # Import the singleton application object
 from telegram_bot import application
@@ -229,9 +230,11 @@ async def handle_approved_withdrawal(data: ApprovedWithdrawal = Body(...)):
 
         # Make the HTTP request to the withdraw endpoint
         # this updates ledger and balance in the Returns app database
+        # the blocking request runs in a worker thread, on the shared keep-alive session of DataHandler
         withdraw_url = f"{CONFIG.RETURNS_API.APPSERVER_URL}{CONFIG.RETURNS_API.WITHDRAW}"
-        response = requests.post(withdraw_url, json=payload)
+        response = await asyncio.to_thread(DataHandler.http_session().post, withdraw_url, json=payload)
         response.raise_for_status()  # Raise an exception for HTTP errors
+        invalidate_client(chat_id)  # the bot must not show the balance from before the withdrawal
 
         # Create and send a confirmation message
         message = (
@@ -367,9 +370,10 @@ async def balance_rollback(data: RollbackWithdrawalData = Body(...)):
         # Define the URL for the rollback endpoint
         rollback_url = f"{CONFIG.RETURNS_API.APPSERVER_URL}{CONFIG.RETURNS_API.ROLLBACK_WITHDRAWAL}"
 
-        # Make the request to the Returns app
-        response = requests.post(rollback_url, json={"chat_id": chat_id, "amount": amount})
+        # Make the request to the Returns app, in a worker thread so the event loop isn't blocked
+        response = await asyncio.to_thread(DataHandler.http_session().post, rollback_url, json={"chat_id": chat_id, "amount": amount})
         response.raise_for_status()  # Raise an HTTPError if the response status is 4xx or 5xx
+        invalidate_client(chat_id)  # the bot must not show the balance from before the rollback
 
         # Create and send a confirmation message
         message = (
@@ -402,11 +406,10 @@ async def get_unidentified_deposits():
         HTTPException: If any error occurs during retrieval.
     """
     try:
-        # Instantiate DataHandler
-        data_handler = DataHandler()
-
-        # Call the method to retrieve deposits
-        deposits_list = data_handler.get_unidentified_deposits()
+        # Instantiate DataHandler and call the method to retrieve deposits,
+        # the with block gives the pooled connection back afterwards
+        with DataHandler() as data_handler:
+            deposits_list = data_handler.get_unidentified_deposits()
 
         # Return the list of dictionaries as JSON
         return deposits_list
@@ -436,15 +439,14 @@ async def update_depositlogs_refund(data: UpdateDepositLogsRefundRequest = Body(
 
         # we need to add single quotes as IDs are stored with single-quotes in db.
         p_transaction_id = f"'{p_transaction_id}'"
-        print(f"\n\n\np_transaction_id: {p_transaction_id}\np_refund_transaction_id: {p_refund_transaction_id}\n\n\n")
 
         # Log the received data
         logging.info(f"Updating deposit log with ID: {p_transaction_id}")
         logging.info(f"- Refund Transaction ID: {p_refund_transaction_id}")
 
         # Instantiate the DataHandler and call the update_depositlogs_refund method
-        database = DataHandler()
-        database.update_depositlogs_refund(p_transaction_id, p_refund_transaction_id)
+        with DataHandler() as database:
+            database.update_depositlogs_refund(p_transaction_id, p_refund_transaction_id)
 
         # Return a success message
         return {"status": "success", "message": "Deposit log updated with refund data"}
@@ -454,6 +456,28 @@ async def update_depositlogs_refund(data: UpdateDepositLogsRefundRequest = Body(
         raise HTTPException(status_code=500, detail="Error updating deposit log with refund data")
 
 
+@app.post("/api/invalidate_address_cache")
+async def invalidate_address_cache():
+    """
+    Endpoint to clear the cached deposit addresses, central address and private keys,
+    e.g. after keys were rotated or compromised, so they are read from the database again.
+
+    Returns:
+        dict: A success message if the caches were cleared.
+
+    Raises:
+        HTTPException: If any error occurs while clearing the caches.
+    """
+    try:
+        DataHandler.invalidate_address_cache()
+        logging.info("Deposit address and private key caches cleared")
+        return {"status": "success", "message": "Address caches cleared"}
+
+    except Exception as e:
+        logging.error(f"Error clearing address caches: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error clearing address caches")
+
+
 
 
 if __name__ == "__main__":
@@ -2,12 +2,16 @@ import re
 import json
 import base58
 import logging
+import logging.handlers
+import queue
+import atexit
 import signal
+import sys
 import asyncio
 import uvicorn
 import hashlib
-import requests
 import aiohttp
+from cachetools import TTLCache
 from concurrent.futures import ThreadPoolExecutor
 # from tronapi import Tron
 from decimal import Decimal, ROUND_HALF_UP
@@ -26,15 +30,44 @@ from bot_workflows import Workflows
 from deposit_logs import DepositLogs
 from transfer import Funds
 from telegram_bot import application
+from net import HTTPClient
+from cache import balance_cache, client_cache
 
-# Set up logging
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on every platform (e.g. Windows)
+    uvloop = None
+
+# use uvloop for every event loop created from here on (including the Telegram bot loop the polling jobs run on)
+if uvloop:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard json module
+    orjson = None
+
+# JSON decoder for callback data and API responses
+json_loads = orjson.loads if orjson else json.loads
+
+# Set up logging: the root logger only puts the records on a queue, a QueueListener thread formats
+# and writes them, so logging calls on the bot loop and in the transfer threads don't wait for the I/O.
+# force=True replaces the handlers the imported modules' basicConfig calls installed already
+log_queue = queue.SimpleQueue()
+log_stream_handler = logging.StreamHandler()
+log_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = logging.handlers.QueueListener(log_queue, log_stream_handler, respect_handler_level=True)
 logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', 
-    level=logging.INFO
+    handlers=[logging.handlers.QueueHandler(log_queue)],
+    level=logging.INFO,
+    force=True
 )
+log_listener.start()
+# flush the records still queued when the process exits
+atexit.register(log_listener.stop)
 
-# global executor
-executor = ThreadPoolExecutor(max_workers=3)
+# global executor, only runs the FastAPI server (the deposit pollers are JobQueue jobs on the bot's loop)
+executor = ThreadPoolExecutor(max_workers=1)
 
 # define the global shutdown event
 shutdown_event = asyncio.Event()
@@ -44,11 +77,136 @@ logger = logging.getLogger(__name__)
 
 # global flag for shutdown signal
 # shutdown_event = asyncio.Event()
-executor = ThreadPoolExecutor(max_workers=3)
 
 
+# workflow function names, resolved once at import time for use on hot paths
+ACTION_START = Workflows.Start.MENU_0['function']
+ACTION_SHOW_DEPOSIT_ADDRESS = Workflows.RequestDeposit.SDA_0['function']
+ACTION_ASK_REFERRAL = Workflows.RequestDeposit.CAR_2['function']
+ACTION_ENTER_REFERRAL_CODE = Workflows.RequestDeposit.ERC_3['function']
+ACTION_SHOW_BALANCE = Workflows.GetBalance.GEB_0['function']
+ACTION_REQUEST_WITHDRAWAL = Workflows.Withdraw.WDR_0['function']
+ACTION_SHOW_COMMAND_LIST = Workflows.GetHelp.HLP_0['function']
+ACTION_GOTO_CHAT = Workflows.GotoChat.GOC_0['function']
+ACTION_GET_STATISTICS = Workflows.GetStatistics.GES_0['function']
+ACTION_VIEW_FAQ = Workflows.GotoFAQ.GOF_0['function']
+ACTION_CONTACT_SUPPORT = Workflows.ContactSupport.COS_0['function']
+ACTION_SHOW_REFERRAL_CODE = Workflows.GetReferralCode.GRC_0['function']
+
+# conversation status while a withdrawal request waits for text input
+STATUS_AWAITING_WITHDRAWAL_AMOUNT = 'withdrawal: awaiting amount'
+STATUS_AWAITING_WITHDRAWAL_WALLET = 'withdrawal: awaiting wallet'
+
+# compact callback_data: "<code>|<decision>[|<argument>]" instead of a JSON object, Telegram limits callback_data to 64 bytes
+CALLBACK_STATUS_CODES = {
+    'RC': ACTION_SHOW_REFERRAL_CODE,
+    'RD': "request_deposit",
+    'GB': "get_balance",
+    'RW': "request_withdraw",
+    'GC': ACTION_GOTO_CHAT,
+    'GS': ACTION_GET_STATISTICS,
+    'FQ': ACTION_VIEW_FAQ,
+    'CS': ACTION_CONTACT_SUPPORT,
+    'CD': "client_commit_to_deposit",
+    'AR': ACTION_ASK_REFERRAL,
+    'WC': "withdrawal: confirm",
+    'PC': "payout: confirm",
+}
+CALLBACK_CODES = {status: code for code, status in CALLBACK_STATUS_CODES.items()}
+
+
+def encode_callback(status: str, decision: str = "", argument=None) -> str:
+    """
+    Encodes a button callback into the compact callback_data format.
+
+    Args:
+        status (str): The status the button triggers, must be a value of CALLBACK_STATUS_CODES.
+        decision (str, optional): The decision of the button, e.g. 'yes' or 'no'.
+        argument (optional): Additional value, e.g. the client chat ID of a payout.
+
+    Returns:
+        str: The callback_data string.
+    """
+    code = CALLBACK_CODES[status]
+    if argument is None:
+        return f"{code}|{decision}"
+    return f"{code}|{decision}|{argument}"
+
+
+def decode_callback(callback_data: str):
+    """
+    Decodes callback_data created by encode_callback(). Buttons sent before the compact format
+    was introduced still carry JSON and are decoded as such.
+
+    Args:
+        callback_data (str): The callback_data of the callback query.
+
+    Returns:
+        tuple: status, decision and argument (None if the callback has no argument).
+    """
+    if callback_data.startswith('{'):
+        legacy = json_loads(callback_data)
+        return legacy.get("status"), legacy.get("decision"), None
+    parts = callback_data.split("|", 2)
+    status = CALLBACK_STATUS_CODES.get(parts[0])
+    decision = parts[1] if len(parts) > 1 else ""
+    argument = parts[2] if len(parts) > 2 else None
+    return status, decision, argument
+
+
+# inline keyboards, built once at import time and reused for every message
+START_MENU_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("Get Your FREE REFERRAL Code\u2003💸", callback_data=encode_callback(ACTION_SHOW_REFERRAL_CODE))],
+    [InlineKeyboardButton("Deposit\u2003\u2003\u2003\u2003💳", callback_data=encode_callback("request_deposit")),
+     InlineKeyboardButton("Balance\u2003\u2003\u2003🏦", callback_data=encode_callback("get_balance"))],
+    [InlineKeyboardButton("Withdraw\u2003💰", callback_data=encode_callback("request_withdraw")),
+     InlineKeyboardButton("AlgoEagle Chat\u2003💬", callback_data=encode_callback(ACTION_GOTO_CHAT))],
+    [InlineKeyboardButton("Statistics\u2003📈", callback_data=encode_callback(ACTION_GET_STATISTICS)),
+     InlineKeyboardButton("FAQ\u2003ℹ️", callback_data=encode_callback(ACTION_VIEW_FAQ))],
+    [InlineKeyboardButton("Support\u2003💁‍♂️", callback_data=encode_callback(ACTION_CONTACT_SUPPORT))],
+])
+
+COMMIT_DEPOSIT_KEYBOARD = InlineKeyboardMarkup([[
+    InlineKeyboardButton("confirm", callback_data=encode_callback("client_commit_to_deposit", "yes")),
+    InlineKeyboardButton("I am not ready yet", callback_data=encode_callback("client_commit_to_deposit", "no")),
+]])
+
+ASK_REFERRAL_KEYBOARD = InlineKeyboardMarkup([[
+    InlineKeyboardButton("enter code", callback_data=encode_callback(ACTION_ASK_REFERRAL, "referral")),
+    InlineKeyboardButton("skip", callback_data=encode_callback(ACTION_ASK_REFERRAL, "skip")),
+]])
+
+CONFIRM_WITHDRAWAL_KEYBOARD = InlineKeyboardMarkup([[
+    InlineKeyboardButton("confirm", callback_data=encode_callback("withdrawal: confirm", "yes")),
+    InlineKeyboardButton("cancel", callback_data=encode_callback("withdrawal: confirm", "no")),
+]])
+
+# deposit commitment prompt, depends on configuration only
+DEPOSIT_VALIDITY_UNIT = "seconds" if CONFIG.DEPOSIT_ADDR_VALIDITY / 60 < 1 else "minute" if CONFIG.DEPOSIT_ADDR_VALIDITY / 60 == 1 else "minutes"
+DEPOSIT_VALIDITY_VALUE = CONFIG.DEPOSIT_ADDR_VALIDITY if CONFIG.DEPOSIT_ADDR_VALIDITY < 60 else int(CONFIG.DEPOSIT_ADDR_VALIDITY/60)
+COMMIT_DEPOSIT_TEXT = f"❓ Make a Deposit\n\nDue to high demand, the deposit address necessary to make a deposit will only be reserved for {DEPOSIT_VALIDITY_VALUE} {DEPOSIT_VALIDITY_UNIT}.\n\n<b>IMPORTANT:\nPlease make sure that you send the USDT on the POLYGON (MATIC) Network.</b>\n\nPlease confirm if you are ready to make the deposit now."
+
+# static parts of the withdrawal request POST and admin notification
+JSON_HEADERS = {'Content-Type': 'application/json'}
+WITHDRAWAL_REQUEST_MESSAGE_PREFIX = "<b>🔴 WITHDRAWAL REQUEST 💵</b>\n\nBy user: "
+
+# format of an Ethereum/Polygon wallet address, checked before any further validation
+ETH_ADDRESS_PATTERN = re.compile(r'0x[a-fA-F0-9]{40}')
+
+# number of batches fetched by consecutive runs of the poll_recent_deposits job (repeats endlessly)
+DEPOSIT_POLLING_CYCLE = (1, 1, 2, 1, 1, 5)
+
 # Initialize global variables
-active_chats = []
+# deposit addresses handed out by show_deposit_address: {address: client}; a reservation expires after
+# CONFIG.DEPOSIT_ADDR_RESERVATION_TTL seconds, then the address can be handed out to the next client
+deposit_address_owners = TTLCache(maxsize=1024, ttl=CONFIG.DEPOSIT_ADDR_RESERVATION_TTL)
+
+# chats whose withdrawal confirmation is being processed, updates are handled concurrently
+withdrawal_confirmations_in_progress = set()
+
+# start menu logo: file content read once, Telegram file_id once it has been uploaded
+logo_bytes = None
+logo_file_id = None
 
 try:
     database = DataHandler()
@@ -68,6 +226,18 @@ except Exception as e:
     logger.error(f"Failed to initialize ClientWithdrawal: {e}")
     raise
 
+try:
+    usdt = Funds.USDT()
+except Exception as e:
+    logger.error(f"Failed to initialize Funds.USDT: {e}")
+    raise
+
+# limits the deposit-to-central transfers running at the same time, across all sweeps
+transfer_semaphore = asyncio.Semaphore(CONFIG.ETHPOLYGON.TRANSFER_CONCURRENCY)
+
+# refids of the deposits whose transfer is being processed, a later sweep doesn't send them again
+transfers_in_flight = set()
+
 
 async def validate_address(address, chat_id):
     """
@@ -107,7 +277,7 @@ async def validate_ethereum_address(address, chat_id):
 
     try:
         # Check address format
-        if not re.match(r'^0x[a-fA-F0-9]{40}$', address):
+        if not ETH_ADDRESS_PATTERN.fullmatch(address):
             message = f"<code>checking wallet format....... 🚫</code>"
             await depositstack.bot_message(chat_id=chat_id, message=message)
             return False
@@ -285,53 +455,21 @@ async def startmenu(update: Update, context: CallbackContext) -> None:
         )
         logger.info(f"Displaying start menu to user: {user.id}")
 
-        keyboard = [
-            [InlineKeyboardButton("Get Your FREE REFERRAL Code\u2003💸", callback_data=json.dumps(
-                {
-                    "status": Workflows.GetReferralCode.GRC_0['function'],
-                    "decision": "",
-                }))],
-            [InlineKeyboardButton("Deposit\u2003\u2003\u2003\u2003💳", callback_data=json.dumps(
-                {
-                    "status": "request_deposit",
-                    "decision": "",
-                })),
-            InlineKeyboardButton("Balance\u2003\u2003\u2003🏦", callback_data=json.dumps(
-                {
-                    "status": "get_balance",
-                    "decision": "",
-                }))],
-            [InlineKeyboardButton("Withdraw\u2003💰", callback_data=json.dumps(
-                {
-                    "status": "request_withdraw",
-                    "decision": "",
-                })),
-            InlineKeyboardButton("AlgoEagle Chat\u2003💬", callback_data=json.dumps(
-                {
-                    "status": Workflows.GotoChat.GOC_0['function'],
-                    "decision": "",
-                }))],
-            [InlineKeyboardButton("Statistics\u2003📈", callback_data=json.dumps(
-                {
-                    "status": Workflows.GetStatistics.GES_0['function'],
-                    "decision": "",
-                })),
-            InlineKeyboardButton("FAQ\u2003ℹ️", callback_data=json.dumps(
-                {
-                    "status": Workflows.GotoFAQ.GOF_0['function'],
-                    "decision": "",
-                }))],
-            [InlineKeyboardButton("Support\u2003💁‍♂️", callback_data=json.dumps(
-                {
-                    "status": Workflows.ContactSupport.COS_0['function'],
-                    "decision": "",
-                }))],
-        ]
-
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = START_MENU_KEYBOARD
 
-        with open(img, 'rb') as imgt:
-            await update.message.reply_photo(photo=img, caption=message, parse_mode='HTML', reply_markup=reply_markup)
+        # after the first upload the logo is referenced by its Telegram file_id instead of being sent again
+        global logo_bytes, logo_file_id
+        if logo_file_id:
+            photo = logo_file_id
+        else:
+            if logo_bytes is None:
+                with open(img, 'rb') as imgt:
+                    logo_bytes = imgt.read()
+            photo = logo_bytes
+
+        sent_message = await update.message.reply_photo(photo=photo, caption=message, parse_mode='HTML', reply_markup=reply_markup)
+        if logo_file_id is None and sent_message.photo:
+            logo_file_id = sent_message.photo[-1].file_id
     except FileNotFoundError:
         error_message = "Logo image file not found. Please check the LOGO_PATH in the configuration."
         logger.error(error_message)
@@ -446,18 +584,22 @@ async def handle_message(update: Update, context: CallbackContext) -> None:
         await update.message.reply_text('An error occurred while processing your message. Please try again later.')
 
 
-def add_chat(update: Update):
+def get_client(update: Update, context: CallbackContext) -> Client:
     """
-    Adds a new chat to the active_chats list.
+    Retrieves the client object of the user from context.user_data, creating it on first contact.
 
     Args:
         update (Update): The update object representing an incoming update.
-        chat_id (int): The chat ID of the new chat.
+        context (CallbackContext): The context object holding the user's data.
 
     Returns:
-        dict: The new Telegram user object added to the active_chats list.
+        Client: The client object of the user.
     """
     try:
+        client = context.user_data.get('client')
+        if client is not None:
+            return client
+
         # Extract user information from the update
         if update.message:
             user = update.effective_user
@@ -468,89 +610,21 @@ def add_chat(update: Update):
 
         firstname = user.first_name or f'TGID{new_chat_id}'
         lastname = user.last_name or f'TGID{new_chat_id}'
-        language = user.language_code or 'en'
-        
+        language = sys.intern(user.language_code or 'en')  # a handful of distinct codes, share one string object per code
 
         # Create a new user object
-        user_object = Client(chat_id=new_chat_id,
-                             firstname=firstname,
-                             lastname=lastname,
-                             lang=language,
-                             status=Workflows.Idle.IDLE_0)
-        
-        # Get the current timestamp
-        timestamp = datetime.now()
-
-        # Create a new Telegram user dictionary
-        new_tguser = {
-            'chat_id': new_chat_id,
-            'user_object': user_object,
-            'create_time': timestamp,
-            'last_accessed': timestamp
-        }
-
-        # Add the new user to the active_chats list
-        active_chats.append(new_tguser)
-        logger.info(f"New chat added: {new_tguser}")
-        
-        return new_tguser
-
-    except Exception as e:
-        logger.error(f"Error adding chat for user {new_chat_id}: {e}")
-        raise
-
-
-def get_client_object(update: Update, chat_id) -> Client:
-    """
-    Retrieves the client object associated with the given chat_id.
-
-    Args:
-        update (Update): The update object representing an incoming update.
-        chat_id (int): The chat ID to look up in active_chats.
-
-    Returns:
-        Client: The client object if found, None otherwise.
-    """
-    try:
-        for client in active_chats:
-            if client['chat_id'] == chat_id:
-                client_object = client['user_object']
-                logger.info(f"Client object found for chat_id {chat_id}")
-                return client_object
-        
-        logger.warning(f"No client object found for chat_id {chat_id}")
-        return None
-    
-    except Exception as e:
-        logger.error(f"Error retrieving client object for chat_id {chat_id}: {e}")
-        raise
-
-
-def check_chat(update, chat_id):
-    """
-    Checks if a chat exists in active_chats based on chat_id. Updates last_accessed timestamp if found,
-    otherwise adds a new chat using add_chat function.
-
-    Args:
-        update (Update): The update object representing an incoming update.
-        chat_id (int): The chat ID to check or add.
+        client = Client(chat_id=new_chat_id,
+                        firstname=firstname,
+                        lastname=lastname,
+                        lang=language,
+                        status=Workflows.Idle.IDLE_0)
+
+        context.user_data['client'] = client
+        logger.info(f"New client added: {client}")
+        return client
 
-    Returns:
-        dict: The updated or newly added chat dictionary.
-    """
-    try:
-        for tguser in active_chats:
-            if tguser['chat_id'] == chat_id:
-                timestamp = datetime.now()
-                tguser['last_accessed'] = timestamp
-                logger.info(f"Chat updated for chat_id {chat_id}")
-                return tguser
-        
-        logger.warning(f"Chat not found for chat_id {chat_id}. Adding new chat.")
-        return add_chat(update)
-    
     except Exception as e:
-        logger.error(f"Error checking chat for chat_id {chat_id}: {e}")
+        logger.error(f"Error retrieving client object: {e}")
         raise
 
 
@@ -594,7 +668,7 @@ async def show_deposit_address(update: Update, context: CallbackContext, chat_id
 
     """
     try:
-        client: Client = get_client_object(update, chat_id)
+        client: Client = get_client(update, context)
 
         # Determine if the message is from an ordinary chat or a callback query
         if update.message:
@@ -604,6 +678,9 @@ async def show_deposit_address(update: Update, context: CallbackContext, chat_id
         else:
             raise ValueError("Neither update.message nor update.callback_query found.")
         
+        if client.active_deposit_address and deposit_address_owners.get(client.active_deposit_address) is not client:
+            client.active_deposit_address = ""  # the reservation expired, the address may be reserved for another client now
+
         if client.active_deposit_address:
             message = f"⚠️ <b>You already requested a deposit.</b>\n\n"
             message += f"Please send your deposit to the following address:\n"
@@ -616,22 +693,20 @@ async def show_deposit_address(update: Update, context: CallbackContext, chat_id
         text = "Preparing deposit address..."
         await message_obj.reply_text(text)
 
-        response_data = database.get_depositaddresses()
-        print(f"RESPONSE_DATA: {response_data}")
+        # cached by DataHandler for CONFIG.DEPOSIT_ADDR_CACHE_TTL seconds, read in a worker thread on a cache miss
+        response_data = await asyncio.to_thread(database.get_depositaddresses)
+        logger.debug("RESPONSE_DATA: %s", response_data)
 
         deposit_addresses = response_data.get('result', [])
 
-        in_use = False
-        for deposit_address in deposit_addresses:
-            for chat in active_chats:
-                client_object: Client = chat['user_object']
-                if client_object.active_deposit_address and client_object.active_deposit_address == deposit_address['address']:
-                    in_use = True
-                    break
-
-            if not in_use:
-                client.active_deposit_address = deposit_address['address']
-                break
+        # pick the first address not handed out to another client
+        free_address = next((deposit_address['address'] for deposit_address in deposit_addresses if deposit_address['address'] not in deposit_address_owners), None)
+        if free_address is None:
+            logger.warning(f"No free deposit address available for chat_id {chat_id}")
+            await send_message(message_obj, context, "⚠️ All deposit addresses are in use right now. Please try again in a few minutes.")
+            return
+        client.active_deposit_address = free_address
+        deposit_address_owners[free_address] = client
 
         bot_text = "<b><u>Make a Deposit:</u></b>\n\n"
         bot_text += "💳  Please make your deposit to this address:\n\n" + f"<code>{client.active_deposit_address}</code>\n"
@@ -666,23 +741,23 @@ async def get_factor():
     }
 
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()  # Raise an error for bad status codes
-        data = response.json()  # Parse the response as JSON
+        async with HTTPClient.session().get(url, params=params) as response:
+            response.raise_for_status()  # Raise an error for bad status codes
+            data = await response.json(loads=json_loads)  # Parse the response as JSON
         
         if data["status"] == "success":
             factor = data["factor"]
         else:
-            print("Error:", data["message"])
+            logger.error(f"Error: {data['message']}")
             factor = 0
     
-    except requests.exceptions.RequestException as e:
-        print(f"Request failed: {e}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Request failed: {e}")
 
     return factor, now
 
 
-async def get_balance(chat_id: int):
+async def fetch_balance_from_api(chat_id: int):
     """
     Fetches the balance, firstname, lastname and currency through
     remote integration endpoint from the Returns server app
@@ -693,9 +768,9 @@ async def get_balance(chat_id: int):
     }
 
     try:
-        response = requests.post(balance_url, json=balance_data)
-        response.raise_for_status()  # Raise an error for bad status codes
-        balance_data = response.json()  # Parse the response as JSON
+        async with HTTPClient.session().post(balance_url, json=balance_data) as response:
+            response.raise_for_status()  # Raise an error for bad status codes
+            balance_data = await response.json(loads=json_loads)  # Parse the response as JSON
         balance_info = balance_data['balance'][0]
 
         if balance_data["status"] == "success":
@@ -708,12 +783,12 @@ async def get_balance(chat_id: int):
                 balance = 0
             last_update_date = balance_info['last_update_date']
         else:
-            print("Error:", balance_data["message"])
+            logger.error(f"Error: {balance_data['message']}")
             balance_info = {}
         
-    except (requests.exceptions.HTTPError,
-            requests.exceptions.ConnectionError,
-            requests.exceptions.Timeout) as e:                
+    except (aiohttp.ClientResponseError,
+            aiohttp.ClientConnectionError,
+            asyncio.TimeoutError) as e:                
 
         # if callback == False:
         #     await update.message.reply_text("The server is currently offline. Please try later again.")
@@ -728,8 +803,8 @@ async def get_balance(chat_id: int):
         balance = -1
         firstname, lastname, currency = "", "", ""
 
-    except requests.exceptions.RequestException as e:
-        print(f"Request failed: {e}")
+    except aiohttp.ClientError as e:
+        logger.error(f"Request failed: {e}")
         balance_info = {}
         balance = -1
         firstname, lastname, currency = "", "", ""
@@ -737,6 +812,37 @@ async def get_balance(chat_id: int):
     return balance, firstname, lastname, currency
 
 
+async def get_balance(chat_id: int):
+    """
+    Returns the balance, firstname, lastname and currency of chat_id from the cache, or fetches them
+    through fetch_balance_from_api() if they are not cached or older than CONFIG.BALANCE_CACHE_TTL.
+
+    Args:
+        chat_id (int): The ID of the client chat.
+
+    Returns:
+        tuple: balance, firstname, lastname, currency. balance is -1 if it couldn't be fetched.
+    """
+    cached = balance_cache.get(chat_id)
+    if cached is not None:
+        return cached
+
+    result = await fetch_balance_from_api(chat_id)
+    if result[0] != -1:  # don't cache failed fetches
+        balance_cache.set(chat_id, result)
+    return result
+
+
+def invalidate_balance(chat_id=None):
+    """
+    Removes the cached balance of chat_id after a balance changing event, or all cached balances if chat_id is None.
+
+    Args:
+        chat_id (int, optional): The ID of the client chat.
+    """
+    balance_cache.invalidate(chat_id)
+
+
 async def get_factorized_balance(update: Update, context: CallbackContext):
     """
     Retrieves and returns the factorized1 balance information for a client from the database.
@@ -761,11 +867,8 @@ async def get_factorized_balance(update: Update, context: CallbackContext):
         callback = True
 
     try:
-        # fetches oscillation factor
-        factor, now = await get_factor()
-
-        # fetches latest closure balance
-        balance, firstname, lastname, currency = await get_balance(chat_id)
+        # fetches oscillation factor and latest closure balance, they are independent so fetch them concurrently
+        (factor, now), (balance, firstname, lastname, currency) = await asyncio.gather(get_factor(), get_balance(chat_id))
         if balance == -1:
             user_data = context.user_data
             context.user_data['status'] = None
@@ -810,11 +913,12 @@ async def show_balance(update: Update, context: CallbackContext):
         chat_id = update.callback_query.message.chat_id
 
     try:
-        # fetches oscillation factor
-        factor, now = await get_factor()
-
-        # fetches latest closure balance
-        balance, firstname, lastname, currency = await get_balance(chat_id)
+        # fetches oscillation factor, latest closure balance and total deposits, they are independent so fetch them concurrently
+        (factor, now), (balance, firstname, lastname, currency), net_total_deposits = await asyncio.gather(
+            get_factor(),
+            get_balance(chat_id),
+            asyncio.to_thread(database.get_total_deposits_client, p_chat_id=chat_id)
+        )
         if balance == -1:
             user_data = context.user_data
             context.user_data['status'] = None
@@ -824,7 +928,6 @@ async def show_balance(update: Update, context: CallbackContext):
                 await update.message.reply_text("An error occurred while fetching the balance information.")
             return
 
-        net_total_deposits = database.get_total_deposits_client(p_chat_id=chat_id)
         gross_total_deposits = Decimal(net_total_deposits / (100 - CONFIG.FEES.DEPOSIT_FEE) * 100)        
         balance = Decimal(balance)
         minimum_deposit = Decimal(CONFIG.DEPOSIT_MINIMUM)
@@ -914,9 +1017,8 @@ async def request_withdrawal(update: Update, context: CallbackContext):
         # Make the GET request to the endpoint with chat_id as a parameter
         # response = requests.get(CONFIG.ENDPOINT_BASEURL + f'/busy_withdrawal?chat_id={chat_id}')
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(CONFIG.ENDPOINT_BASEURL + f'/busy_withdrawal?chat_id={chat_id}') as resp:
-                response = await resp.json()
+        async with HTTPClient.session().get(CONFIG.ENDPOINT_BASEURL + f'/busy_withdrawal?chat_id={chat_id}') as resp:
+            response = await resp.json()
 
         # Check if the request was successful (status code 200) and parse the JSON response
         if resp.status == 200:
@@ -934,7 +1036,7 @@ async def request_withdrawal(update: Update, context: CallbackContext):
                 elif callback == True:
                     await update.callback_query.message.reply_text(bot_text, parse_mode='HTML')
             else:
-                context.user_data['status'] = 'withdrawal: awaiting amount'
+                context.user_data['status'] = STATUS_AWAITING_WITHDRAWAL_AMOUNT
                 bot_text = f"Enter withdrawal amount or 'cancel' to exit the process:"
                 if callback == False: 
                     await update.message.reply_text(bot_text, parse_mode='HTML')
@@ -983,29 +1085,7 @@ async def client_commit_to_deposit(chat_id, context: CallbackContext):
 
     """
     try:
-        keyboard_options = [
-            [
-                InlineKeyboardButton(
-                    "confirm",
-                    callback_data=json.dumps({
-                        "status": "client_commit_to_deposit",
-                        "decision": "yes",
-                    })
-                ),
-                InlineKeyboardButton(
-                    "I am not ready yet",
-                    callback_data=json.dumps({
-                        "status": "client_commit_to_deposit",
-                        "decision": "no",
-                    })
-                )
-            ]
-        ]
-        unit = "seconds" if CONFIG.DEPOSIT_ADDR_VALIDITY / 60 < 1 else "minute" if CONFIG.DEPOSIT_ADDR_VALIDITY / 60 == 1 else "minutes"
-        value = CONFIG.DEPOSIT_ADDR_VALIDITY if CONFIG.DEPOSIT_ADDR_VALIDITY < 60 else int(CONFIG.DEPOSIT_ADDR_VALIDITY/60)
-        text = f"❓ Make a Deposit\n\nDue to high demand, the deposit address necessary to make a deposit will only be reserved for {value} {unit}.\n\n<b>IMPORTANT:\nPlease make sure that you send the USDT on the POLYGON (MATIC) Network.</b>\n\nPlease confirm if you are ready to make the deposit now."
-        reply_markup = InlineKeyboardMarkup(keyboard_options)
-        await context.bot.send_message(chat_id=chat_id, text=text, reply_markup=reply_markup, parse_mode='HTML')
+        await context.bot.send_message(chat_id=chat_id, text=COMMIT_DEPOSIT_TEXT, reply_markup=COMMIT_DEPOSIT_KEYBOARD, parse_mode='HTML')
 
     except Exception as e:
         error_message = f"Error occurred while sending deposit confirmation message: {str(e)}"
@@ -1029,29 +1109,10 @@ async def client_to_deposit_ask_referral(chat_id, context: CallbackContext):
 
     """
     try:
-        keyboard_options = [
-            [
-                InlineKeyboardButton(
-                    "enter code",
-                    callback_data=json.dumps({
-                        "status": Workflows.RequestDeposit.CAR_2['function'], #client_ask_referral
-                        "decision": "referral",
-                    })
-                ),
-                InlineKeyboardButton(
-                    "skip",
-                    callback_data=json.dumps({
-                        "status": Workflows.RequestDeposit.CAR_2['function'], #client_ask_referral
-                        "decision": "skip",
-                    })
-                )
-            ]
-        ]
 
         dep_fee_discount = CONFIG.FEES.REFEREE_DEPOSIT_FEE_DISCOUNT / (CONFIG.FEES.DEPOSIT_FEE/100)
         text = f"💸💸 Got a Code? Unlock Exclusive Rewards! 💸💸\n\nEnhance your deposit benefits! Enter a referral code to enjoy a reduced deposit fee — from {CONFIG.FEES.DEPOSIT_FEE}% down to just {CONFIG.FEES.DEPOSIT_FEE - CONFIG.FEES.REFEREE_DEPOSIT_FEE_DISCOUNT}%. Or, use a bonus code to boost your deposit with a special multiplier, giving you even more credited value!\n\nDon't miss out on these exciting rewards!"
-        reply_markup = InlineKeyboardMarkup(keyboard_options)
-        await context.bot.send_message(chat_id=chat_id, text=text, reply_markup=reply_markup, parse_mode='HTML')
+        await context.bot.send_message(chat_id=chat_id, text=text, reply_markup=ASK_REFERRAL_KEYBOARD, parse_mode='HTML')
 
     except Exception as e:
         error_message = f"client_to_deposit_ask_referral: {str(e)}"
@@ -1076,24 +1137,6 @@ async def client_confirm_withdrawal(chat_id, context: CallbackContext):
     """
     try:
         # Define keyboard options with 'confirm' and 'cancel' buttons
-        keyboard_options = [
-            [
-                InlineKeyboardButton(
-                    "confirm",
-                    callback_data=json.dumps({
-                        "status": "withdrawal: confirm",
-                        "decision": "yes",
-                    })
-                ),
-                InlineKeyboardButton(
-                    "cancel",
-                    callback_data=json.dumps({
-                        "status": "withdrawal: confirm",
-                        "decision": "no",
-                    })
-                )
-            ]
-        ]
         
         # Retrieve withdrawal data for the client
         withdrawal = withdrawals.get_withdrawal_data(chat_id)
@@ -1103,8 +1146,7 @@ async def client_confirm_withdrawal(chat_id, context: CallbackContext):
         text = f"❓ Withdraw funds\n\nRequested amount: USDT {withdrawal['amount']}\nBeneficiary wallet: {withdrawal['wallet']}\n\n Please confirm with 'confirm' to proceed or 'cancel' to cancel the withdrawal."
         
         # Send message with inline keyboard for confirmation
-        reply_markup = InlineKeyboardMarkup(keyboard_options)
-        await context.bot.send_message(chat_id=chat_id, text=text, reply_markup=reply_markup, parse_mode='HTML')
+        await context.bot.send_message(chat_id=chat_id, text=text, reply_markup=CONFIRM_WITHDRAWAL_KEYBOARD, parse_mode='HTML')
     
     except Exception as e:
         # Handle any exceptions that occur during message sending or data retrieval
@@ -1118,14 +1160,14 @@ async def fetch_client_from_api(chat_id):
         payload = {"chat_id": chat_id}
         
         # Make the API call to get client details
-        response = requests.post(f"{CONFIG.RETURNS_API.APPSERVER_URL}{CONFIG.RETURNS_API.GET_CLIENT}", json=payload)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        
-        # Parse the response JSON
-        client = response.json()
+        async with HTTPClient.session().post(f"{CONFIG.RETURNS_API.APPSERVER_URL}{CONFIG.RETURNS_API.GET_CLIENT}", json=payload) as response:
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            
+            # Parse the response JSON
+            client = await response.json(loads=json_loads)
         
         return client
-    except requests.HTTPError as e:
+    except aiohttp.ClientResponseError as e:
         logging.error(f"HTTP error occurred: {e}")
         return None
     except Exception as e:
@@ -1133,6 +1175,37 @@ async def fetch_client_from_api(chat_id):
         return None
 
 
+async def get_client_cached(chat_id):
+    """
+    Returns the client details of chat_id from the cache, or fetches them through
+    fetch_client_from_api() if they are not cached or older than CONFIG.CLIENT_CACHE_TTL.
+
+    Args:
+        chat_id (int): The ID of the client chat.
+
+    Returns:
+        dict or None: The client details, None if they couldn't be fetched.
+    """
+    client = client_cache.get(chat_id)
+    if client is not None:
+        return client
+
+    client = await fetch_client_from_api(chat_id)
+    if client is not None:  # don't cache failed fetches
+        client_cache.set(chat_id, client)
+    return client
+
+
+def invalidate_client_cache(chat_id=None):
+    """
+    Removes the cached client details of chat_id after a balance changing event, or all cached client details if chat_id is None.
+
+    Args:
+        chat_id (int, optional): The ID of the client chat.
+    """
+    client_cache.invalidate(chat_id)
+
+
 async def admin_confirm_payout(chat_id, chat_id_client, amount, context: CallbackContext):
     """
     Sends a message to the admin confirming the payout details and asking for confirmation.
@@ -1154,26 +1227,13 @@ async def admin_confirm_payout(chat_id, chat_id_client, amount, context: Callbac
         # Define keyboard options with 'confirm' and 'cancel' buttons
         keyboard_options = [
             [
-                InlineKeyboardButton(
-                    "confirm",
-                    callback_data=json.dumps({
-                        "status": f"payout: confirm{chat_id_client}",
-                        "decision": "yes",
-                    })
-                ),
-                InlineKeyboardButton(
-                    "cancel",
-                    callback_data=json.dumps({
-                        "status": f"payout: confirm{chat_id_client}",
-                        "decision": "no",
-                    })
-                )
+                InlineKeyboardButton("confirm", callback_data=encode_callback("payout: confirm", "yes", chat_id_client)),
+                InlineKeyboardButton("cancel", callback_data=encode_callback("payout: confirm", "no", chat_id_client))
             ]
         ]
         
         # Retrieve client data for the payout
-        client = await fetch_client_from_api(chat_id_client)
-        print(f"\n\n\nCLIENT = {client}\n\n\n")
+        client = await get_client_cached(chat_id_client)
         logger.info(f"Retrieved client data for payout confirmation: {client}")
         
         # Construct message with payout details
@@ -1227,15 +1287,18 @@ async def start_chat_with_support(update: Update, context: CallbackContext) -> N
 
 async def get_welcome_statistics(update: Update, context: CallbackContext):
     logger.info("GET_WELCOME_STATISTICS")
-    model = DataHandler()
     if update.message:
         user_id = update.message.from_user.id
     else:
         user_id = update.callback_query.message.from_user.id
     logger.info(f"USER_ID: {user_id}")
-    r_day = model.get_bot_returns_yesterday()
-    r_week = model.calculate_weekly_compounded_return()
-    r_month = model.calculate_monthly_compounded_return()
+    with DataHandler() as model:
+        # the requests are independent, run them concurrently in worker threads
+        r_day, r_week, r_month = await asyncio.gather(
+            asyncio.to_thread(model.get_bot_returns_yesterday),
+            asyncio.to_thread(model.calculate_weekly_compounded_return),
+            asyncio.to_thread(model.calculate_monthly_compounded_return)
+        )
 
     message = (
         f"<b><u>Recent profit:</u></b>\n"
@@ -1250,13 +1313,16 @@ async def get_welcome_statistics(update: Update, context: CallbackContext):
 
 async def get_statistics(update: Update, context: CallbackContext):
     logger.info("GET_STATISTICS")
-    model = DataHandler()
     user_id = update.callback_query.message.from_user.id
     logger.info(f"user_id: {user_id}")
-    r_day = model.get_bot_returns_yesterday()
-    r_week = model.calculate_weekly_compounded_return()
-    r_month = model.calculate_monthly_compounded_return()
-    r_threemonths = model.calculate_three_months_compounded_return()
+    with DataHandler() as model:
+        # the requests are independent, run them concurrently in worker threads
+        r_day, r_week, r_month, r_threemonths = await asyncio.gather(
+            asyncio.to_thread(model.get_bot_returns_yesterday),
+            asyncio.to_thread(model.calculate_weekly_compounded_return),
+            asyncio.to_thread(model.calculate_monthly_compounded_return),
+            asyncio.to_thread(model.calculate_three_months_compounded_return)
+        )
 
     message = (
         "<b>⭐ ⭐   ALGOEAGLE BOT PROFIT   ⭐ ⭐\n\n</b>"
@@ -1291,7 +1357,7 @@ async def show_referral_code(update: Update, context: CallbackContext):
         username = update.callback_query.from_user.username
 
     try:
-        total_deposit_amount = database.get_total_deposits_client(p_chat_id=int(chat_id))
+        total_deposit_amount = await asyncio.to_thread(database.get_total_deposits_client, p_chat_id=int(chat_id))
         gross_total_deposit_amount = total_deposit_amount / (100 - CONFIG.FEES.DEPOSIT_FEE) * 100
 
         if gross_total_deposit_amount < (CONFIG.DEPOSIT_MINIMUM * 0.97):     # tolerance of 3% (100-97 = 3)
@@ -1301,7 +1367,7 @@ async def show_referral_code(update: Update, context: CallbackContext):
             f"We encourage you to deposit using the /deposit command.\n\n"
         )
         else:
-            database.set_client_username(p_chat_id=chat_id, p_username=username)
+            await asyncio.to_thread(database.set_client_username, p_chat_id=chat_id, p_username=username)
 
             dep_fee_discount = CONFIG.FEES.REFEREE_DEPOSIT_FEE_DISCOUNT / (CONFIG.FEES.DEPOSIT_FEE/100)
             message = (
@@ -1346,48 +1412,45 @@ async def execute_workflow_action(update: Update, context: CallbackContext, acti
             chat_id = update.callback_query.message.chat_id
             username = update.callback_query.from_user.username if update.callback_query.from_user.username else no_username
         
-        # Ensure the chat exists or add it if it doesn't
-        check_chat(update, chat_id)
-        
-        # Retrieve client object for the chat
-        client = get_client_object(update, chat_id)
+        # Retrieve client object for the chat, created on first contact
+        client = get_client(update, context)
         
         # Log client data and action string
         logger.info(f"Client DATA: (username: {username}) {client.firstname} {client.lastname}, Balance: {client.balance}, Status: {client.status}, Chat ID: {client.chat_id}, Action String: {action}")
         
         # Execute actions based on the action string
-        if action == 'start':
+        if action == ACTION_START:
             client.status = Workflows.Start.MENU_0
             logger.info(f"CLIENT STATUS: {client.status}")
             await start(update, context)
         
-        elif action == 'show_deposit_address':
+        elif action == ACTION_SHOW_DEPOSIT_ADDRESS:
             client.status = Workflows.RequestDeposit.SDA_0
             logger.info(f"CLIENT STATUS: {client.status}")
             await client_commit_to_deposit(chat_id, context)
             logger.info(f"Executed show_deposit_address action")
         
-        elif action == 'show_balance':
+        elif action == ACTION_SHOW_BALANCE:
             client.status = Workflows.GetBalance.GEB_0
             await show_balance(update, context)
         
-        elif action == 'request_withdrawal':
+        elif action == ACTION_REQUEST_WITHDRAWAL:
             client.status = Workflows.Withdraw.WDR_0
             await request_withdrawal(update, context)
         
-        elif action == 'show_command_list':
+        elif action == ACTION_SHOW_COMMAND_LIST:
             client.status = Workflows.Idle.IDLE_0
             logger.info(f"CLIENT STATUS: {client.status}")
             await help(update, context)
-        elif action == Workflows.GotoChat.GOC_0['function']:
+        elif action == ACTION_GOTO_CHAT:
             await send_group_chat_invite_link(update, context)
-        elif action == Workflows.GotoFAQ.GOF_0['function']:
+        elif action == ACTION_VIEW_FAQ:
             await send_faq(update, context)
-        elif action == Workflows.ContactSupport.COS_0['function']:
+        elif action == ACTION_CONTACT_SUPPORT:
             await start_chat_with_support(update, context)
-        elif action == Workflows.GetStatistics.GES_0['function']:
+        elif action == ACTION_GET_STATISTICS:
             await get_statistics(update, context)
-        elif action == Workflows.GetReferralCode.GRC_0['function']:
+        elif action == ACTION_SHOW_REFERRAL_CODE:
             await show_referral_code(update, context)
         
         else:
@@ -1400,6 +1463,19 @@ async def execute_workflow_action(update: Update, context: CallbackContext, acti
         raise Exception(error_message)
 
 
+# maps the callback status of menu buttons to the workflow action they trigger
+BUTTON_ACTIONS = {
+    "request_deposit": ACTION_SHOW_DEPOSIT_ADDRESS,
+    "get_balance": ACTION_SHOW_BALANCE,
+    "request_withdraw": ACTION_REQUEST_WITHDRAWAL,
+    ACTION_GOTO_CHAT: ACTION_GOTO_CHAT,
+    ACTION_GET_STATISTICS: ACTION_GET_STATISTICS,
+    ACTION_VIEW_FAQ: ACTION_VIEW_FAQ,
+    ACTION_CONTACT_SUPPORT: ACTION_CONTACT_SUPPORT,
+    ACTION_SHOW_REFERRAL_CODE: ACTION_SHOW_REFERRAL_CODE,
+}
+
+
 async def button(update: Update, context: CallbackContext) -> None:
     """
     Handles callback queries from inline buttons.
@@ -1422,18 +1498,17 @@ async def button(update: Update, context: CallbackContext) -> None:
             chat_id = update.callback_query.message.chat_id
         
         query = update.callback_query
+        user_data = context.user_data
         
         # Log chat_id for callback update
         logger.info(f"BUTTON CALLBACK UPDATE CHAT_ID: {query.message.chat_id}")
         
-        callback_data_json = query.data
-        print(f"\n\n\n\ncallback_data_json:\n\n{callback_data_json}\n\n\n\n")
+        callback_data = query.data
+        logger.debug("callback_data: %s", callback_data)
         
-        if callback_data_json:
-            # Deserialize callback data
-            callback_data = json.loads(callback_data_json)
-            status = callback_data.get("status")
-            decision = callback_data.get("decision")
+        if callback_data:
+            # Decode callback data
+            status, decision, _ = decode_callback(callback_data)
 
             # Acknowledge the callback query
             await query.answer()
@@ -1444,98 +1519,102 @@ async def button(update: Update, context: CallbackContext) -> None:
                     await query.edit_message_text(text="You confirmed to make a deposit now.")
                     await client_to_deposit_ask_referral(chat_id, context)
                     #await query.message.reply_text("Please wait while your deposit address is being prepared...")
-                    #client = get_client_object(update, chat_id)
+                    #client = get_client(update, context)
                     # deposit_request = await depositstack.add_deposit_request(update, client)                    
                 else:
                     await query.edit_message_text(text="You decided to not make a deposit yet.")
                     await query.message.reply_text("You're welcome any time to request to make a deposit.")
-            elif status == Workflows.RequestDeposit.CAR_2['function']: #client_ask_referral
+            elif status == ACTION_ASK_REFERRAL: #client_ask_referral
                 if decision == "referral": 
                     await query.edit_message_text("You chose to enter a referral code:\n\nPlease enter the referral code now or write 'cancel' abort the deposit process.")
-                    context.user_data['status'] = Workflows.RequestDeposit.ERC_3['function']  # enter_referral_code
+                    user_data['status'] = ACTION_ENTER_REFERRAL_CODE  # enter_referral_code
                 else:
                     await query.edit_message_text("You chose to continue without a referral code.")
                     await query.message.reply_text("Please wait while your deposit address is being prepared...") 
-                    client = get_client_object(update, chat_id)
+                    client = get_client(update, context)
                     deposit_request = await depositstack.add_deposit_request(update, client)                    
-            elif status == "request_deposit":
-                action = "show_deposit_address"
-                await execute_workflow_action(update, context, action)
-            elif status == "get_balance":
-                action = "show_balance"
-                await execute_workflow_action(update, context, action)
-            elif status == "request_withdraw":
-                action = "request_withdrawal"
-                await execute_workflow_action(update, context, action)
-            elif status == Workflows.GotoChat.GOC_0['function']:
-                action = Workflows.GotoChat.GOC_0['function']
-                await execute_workflow_action(update, context, action)
-            elif status == Workflows.GetStatistics.GES_0['function']:
-                action = Workflows.GetStatistics.GES_0['function']
-                await execute_workflow_action(update, context, action)
-            elif status == Workflows.GotoFAQ.GOF_0['function']:
-                action = Workflows.GotoFAQ.GOF_0['function']
-                await execute_workflow_action(update, context, action)
-            elif status == Workflows.ContactSupport.COS_0['function']:
-                action = Workflows.ContactSupport.COS_0['function']
-                await execute_workflow_action(update, context, action)            
-            elif status == Workflows.GetReferralCode.GRC_0['function']:
-                action = Workflows.GetReferralCode.GRC_0['function']
-                await execute_workflow_action(update, context, action)            
+            elif status in BUTTON_ACTIONS:
+                await execute_workflow_action(update, context, BUTTON_ACTIONS[status])
             elif status == "withdrawal: confirm":
                 if decision == "yes":
-                    client_raw = await fetch_client_from_api(chat_id)
-                    client = client_raw["client"][0]
-                    print(f"\n\n\nCLIENT = {client}\n\n\n")
-                    withdrawal = withdrawals.get_withdrawal_data(chat_id)
-                    amount = withdrawal['amount']
-                    wallet = withdrawal['wallet']
-                    balance, _, _, _ = await get_balance(chat_id)
-                    formatted_balance = f"{balance:.6f}"  # Format balance to 6 decimal places
+                    if chat_id in withdrawal_confirmations_in_progress:
+                        return  # confirm tapped again while the first tap is still being processed
+                    withdrawal_confirmations_in_progress.add(chat_id)
+                    try:
+                        # the balance endpoint returns the client's names as well, one round trip covers both
+                        invalidate_balance(chat_id)  # the admins must see the current balance
+                        (factor, _), (balance, firstname, lastname, _) = await asyncio.gather(get_factor(), get_balance(chat_id))
+                        client = {'firstname': firstname, 'lastname': lastname}
+                        logger.debug("CLIENT = %s", client)
+                        withdrawal = withdrawals.get_withdrawal_data(chat_id)
+                        amount = withdrawal['amount']
+                        wallet = withdrawal['wallet']
+                        # the amount was checked against a possibly cached balance when it was entered, check it against the current one;
+                        # get_factor() returns 0 and get_balance() -1 if they couldn't be fetched, that is no reason to decline
+                        if balance == -1 or not factor:
+                            await query.edit_message_text(text="An error occurred while fetching the balance information. Please try again later with /withdraw.")
+                            user_data['status'] = None  # Reset status because user process ends here
+                            withdrawals.remove_withdrawal(chat_id)
+                            return
+                        if Decimal(str(amount)) > balance * Decimal(factor):
+                            await query.edit_message_text(text=f"Your current balance doesn't cover the withdrawal amount of USDT {amount}. Please check your balance with /balance and start a new withdrawal with /withdraw.")
+                            user_data['status'] = None  # Reset status because user process ends here
+                            withdrawals.remove_withdrawal(chat_id)
+                            return
+                        formatted_balance = f"{balance:.6f}"  # Format balance to 6 decimal places
                     
-                    # Prepare data to send to sister application
-                    data = {
-                        "chat_id": chat_id,
-                        "firstname": client['firstname'],
-                        "lastname": client['lastname'],
-                        "currency": "USDT",
-                        "amount": amount,
-                        "wallet": wallet
-                    }
+                        # Prepare data to send to sister application
+                        data = {
+                            "chat_id": chat_id,
+                            "firstname": client['firstname'],
+                            "lastname": client['lastname'],
+                            "currency": "USDT",
+                            "amount": amount,
+                            "wallet": wallet
+                        }
+                        # serialize once up front, the encoded body is what gets posted
+                        body = orjson.dumps(data) if orjson else json.dumps(data).encode('utf-8')
 
-                    await query.edit_message_text(text=f"You confirmed to request a withdrawal:\n\nChat-ID: {chat_id}\nFirstname: {client['firstname']}\nLastname: {client['lastname']}\nCurrency: USDT\nAmount: {amount}\nWallet: {wallet}")
+                        await query.edit_message_text(text=f"You confirmed to request a withdrawal:\n\nChat-ID: {chat_id}\nFirstname: {client['firstname']}\nLastname: {client['lastname']}\nCurrency: USDT\nAmount: {amount}\nWallet: {wallet}")
 
-                    # Send post request to sister application
-                    url = CONFIG.ENDPOINT_BASEURL + "/request_withdrawal"
-                    headers = {'Content-Type': 'application/json'}
-                    response = requests.post(url, headers=headers, data=json.dumps(data))
-                    logger.info(f"RESPONSE FROM INTEGRATION ENDPOINT: {response}")
+                        # Send post request to sister application
+                        url = CONFIG.ENDPOINT_BASEURL + "/request_withdrawal"
+                        # only the status is needed: the body is never read, leaving the block releases the response
+                        async with HTTPClient.session().post(url, headers=JSON_HEADERS, data=body) as response:
+                            logger.info(f"RESPONSE FROM INTEGRATION ENDPOINT: {response.status}")
                     
-                    context.user_data['status'] = None  # Reset status because user process ends here
+                        user_data['status'] = None  # Reset status because user process ends here
                     
-                    message = (
-                        f"<b>🔴 WITHDRAWAL REQUEST 💵</b>\n\n"
-                        f"By user: {client['firstname']} {client['lastname']}\n"
-                        f"Telegram user-id: <code>{chat_id}</code>\n"
-                        f"Balance USDT {formatted_balance}\n"
-                        f"Withdrawal amount: USDT <code>{amount}</code>\n"
-                        f"Beneficiary account: <code>{wallet}</code>"
-                    )
-                    for admin_chat_id in CONFIG.ADMIN_CHAT_IDS:
-                        try:
-                            await depositstack.bot_message(chat_id=admin_chat_id, message=message)
-                        except Exception as e:
-                            error_message =f"Error occured sending admin notifications: {str(e), admin_chat_id}"
-                            logger.error(error_message)
+                        message = (
+                            f"{WITHDRAWAL_REQUEST_MESSAGE_PREFIX}{client['firstname']} {client['lastname']}\n"
+                            f"Telegram user-id: <code>{chat_id}</code>\n"
+                            f"Balance USDT {formatted_balance}\n"
+                            f"Withdrawal amount: USDT <code>{amount}</code>\n"
+                            f"Beneficiary account: <code>{wallet}</code>"
+                        )
+                        # notify all admins concurrently instead of one after another
+                        admin_chat_ids = CONFIG.ADMIN_CHAT_IDS
+                        results = await asyncio.gather(
+                            *(depositstack.bot_message(chat_id=admin_chat_id, message=message) for admin_chat_id in admin_chat_ids),
+                            return_exceptions=True
+                        )
+                        for admin_chat_id, result in zip(admin_chat_ids, results):
+                            if isinstance(result, Exception):
+                                error_message =f"Error occured sending admin notifications: {str(result), admin_chat_id}"
+                                logger.error(error_message)
                     
-                    message = f"Your request to withdraw USDT {str(amount)} was forwarded to the administrator."
-                    await depositstack.bot_message(chat_id=chat_id, message=message)
+                        message = f"Your request to withdraw USDT {str(amount)} was forwarded to the administrator."
+                        await depositstack.bot_message(chat_id=chat_id, message=message)
                     
-                    withdrawals.remove_withdrawal(chat_id)
+                        withdrawals.remove_withdrawal(chat_id)
+                        invalidate_client_cache(chat_id)  # withdrawal request changes the client's balance
+                        invalidate_balance(chat_id)
+                    finally:
+                        withdrawal_confirmations_in_progress.discard(chat_id)
                 
                 else:
                     await query.edit_message_text(text=f"You clicked on cancel.")
-                    context.user_data['status'] = None  # Reset status because user process ends here
+                    user_data['status'] = None  # Reset status because user process ends here
                     withdrawals.remove_withdrawal(chat_id)
                     message = "Withdrawal canceled by user."
                     await depositstack.bot_message(chat_id=chat_id, message=message)
@@ -1547,158 +1626,285 @@ async def button(update: Update, context: CallbackContext) -> None:
         raise Exception(error_message)
 
 
-async def poll_deposit_request_stack():
+async def poll_deposit_request_stack(context: CallbackContext):
     """
-    Coroutine function to continuously process deposit requests from a stack.
+    JobQueue callback that processes the next deposit request from the stack.
 
-    This function runs indefinitely, processing each deposit request from a stack
-    at a defined interval (CONFIG.DEPOSIT_REQUEST_STACK_INTERVAL).
+    Scheduled by start_telegram_bot() to run every CONFIG.DEPOSIT_REQUEST_STACK_INTERVAL seconds.
 
-    Raises:
-        Exception: If there is an unexpected error during processing of deposit requests.
+    Args:
+        context (CallbackContext): The context object of the job.
     """
     try:
-        while not shutdown_event.is_set():
-                # Process the next deposit request from the stack
-                next_request = await depositstack.process_next()
-                
-                # Sleep for the configured interval before processing the next request
-                await asyncio.sleep(CONFIG.DEPOSIT_REQUEST_STACK_INTERVAL)
-
-    except asyncio.CancelledError:
-        logger.info("poll_deposit_request_stack() was cancelled.")
+        # Process the next deposit request from the stack
+        await depositstack.process_next()
 
     except Exception as e:
         # Handle any exceptions that occur during processing
-        error_message = f"poll_deposit_request_stack() Error: {str(e)}"
-        logger.error(error_message)
-        # raise Exception(error_message) # raising an exception may end this thread
-        await asyncio.sleep(CONFIG.DEPOSIT_REQUEST_STACK_INTERVAL)
+        # raising an exception would only be reported by the JobQueue, log it instead
+        logger.error(f"poll_deposit_request_stack() Error: {str(e)}")
 
 
 async def process_transfers(deposits):
+    """
+    Transfers the deposits on the deposit-accounts to the central collection account.
+
+    Transfers from different deposit addresses run concurrently (bounded by
+    CONFIG.ETHPOLYGON.TRANSFER_CONCURRENCY across all sweeps), transfers from the same
+    deposit address run one after another so their transaction nonces don't collide.
+    Deposits whose transfer is still in flight from an earlier sweep are skipped: they are
+    only marked as transferred once their transaction was sent, so the next poll returns them again.
+
+    Args:
+        deposits (list): List of deposit dictionaries with 'deposit_address', 'amount' and 'refid'.
+    """
+    deposits = [deposit for deposit in deposits if deposit['refid'] not in transfers_in_flight]
     if deposits:
-        usdt = Funds.USDT() 
-        for deposit in deposits: # loop that transfers the deposits on the deposit-accounts to the central collection account
-            logger.info(f"TRANSFERRING DEPOSIT USDT {deposit['amount']} FROM_ADDRESS: {deposit['deposit_address']} TO CENTRAL ACCOUNT")
-            usdt.transfer(from_address=deposit['deposit_address'], amount=deposit['amount'], deposit_tx_id=deposit['refid']) 
-            await asyncio.sleep(2)
-       
+        transfers_in_flight.update(deposit['refid'] for deposit in deposits)
+
+        # group deposits by deposit address
+        deposits_by_address = {}
+        for deposit in deposits:
+            deposits_by_address.setdefault(deposit['deposit_address'], []).append(deposit)
+
+        async def transfer_from_address(address_deposits):
+            async with transfer_semaphore:
+                for deposit in address_deposits:
+                    logger.info(f"TRANSFERRING DEPOSIT USDT {deposit['amount']} FROM_ADDRESS: {deposit['deposit_address']} TO CENTRAL ACCOUNT")
+                    # usdt.transfer() is blocking, run it in a worker thread to keep the event loop free
+                    await asyncio.to_thread(usdt.transfer, from_address=deposit['deposit_address'], amount=deposit['amount'], deposit_tx_id=deposit['refid'])
+
+        try:
+            results = await asyncio.gather(
+                *(transfer_from_address(address_deposits) for address_deposits in deposits_by_address.values()),
+                return_exceptions=True
+            )
+        finally:
+            transfers_in_flight.difference_update(deposit['refid'] for deposit in deposits)
+            # give the database connection of the transfer object back to the pool
+            usdt.database.close()
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error transferring deposit to central account: {str(result)}")
+
         
 
-async def poll_recent_deposits():
+async def poll_recent_deposits(context: CallbackContext):
     """
-    Coroutine function to poll recent deposits from an API or test source periodically.
+    JobQueue callback that polls recent deposits once.
+
+    Scheduled by start_telegram_bot() to run every CONFIG.DEPOSIT_POLLING_INTERVAL seconds.
+    The number of batches fetched per run follows DEPOSIT_POLLING_CYCLE; the position in
+    the cycle is kept in the job's data.
+
+    Args:
+        context (CallbackContext): The context object of the job.
     """
-    cycle_episode = 0
-    full_cycle = [
-        {'number_of_batches': 1, 'interval_delay_sec': CONFIG.DEPOSIT_POLLING_INTERVAL},
-        {'number_of_batches': 1, 'interval_delay_sec': CONFIG.DEPOSIT_POLLING_INTERVAL},
-        {'number_of_batches': 2, 'interval_delay_sec': CONFIG.DEPOSIT_POLLING_INTERVAL},
-        {'number_of_batches': 1, 'interval_delay_sec': CONFIG.DEPOSIT_POLLING_INTERVAL},
-        {'number_of_batches': 1, 'interval_delay_sec': CONFIG.DEPOSIT_POLLING_INTERVAL},
-        {'number_of_batches': 5, 'interval_delay_sec': CONFIG.DEPOSIT_POLLING_INTERVAL}
-    ]
+    job_data = context.job.data
+    try:
+        # Determine polling parameters for the current cycle
+        cycle_episode = job_data['cycle_episode']
+        number_of_batches = DEPOSIT_POLLING_CYCLE[cycle_episode]
+        logger.info(f"cycle_episode: {cycle_episode}   number_of_batches: {number_of_batches}")
+        job_data['cycle_episode'] = (cycle_episode + 1) % len(DEPOSIT_POLLING_CYCLE)
 
-    total_episodes = len(full_cycle)
-    api = EthAPI()
+        # Fetch recent deposits
+        try:
+            all_balances = await asyncio.to_thread(job_data['api'].get_recent_deposits, number_of_batches)
+        except Exception as e:
+            logger.error(f"Failed to fetch recent deposits: {str(e)}")
+            return
 
-    while not shutdown_event.is_set():
+        # Filter active deposits (balances > 0)
+        active_deposits = []
         try:
-            # Determine polling parameters for the current cycle
-            interval_sec = full_cycle[cycle_episode]['interval_delay_sec']
-            number_of_batches = full_cycle[cycle_episode]['number_of_batches']
-            logger.info(f"cycle_episode: {cycle_episode}   interval_sec: {interval_sec}   number_of_batches: {number_of_batches}")
-            cycle_episode = (cycle_episode + 1) % total_episodes
+            active_deposits = [
+                {
+                    'deposit_address': balance['deposit_address'],
+                    'balance': balance['balance']
+                }
+                for balance in all_balances if balance['balance'] > 0
+            ]
+            if active_deposits:
+                logger.info(f"New deposits found: {len(active_deposits)}")
+        except Exception as e:
+            logger.error(f"Error processing deposit balances: {str(e)}")
+            return
 
-            # Sleep for the current cycle's interval before polling
-            await asyncio.sleep(interval_sec)
+        # Insert deposit logs and fetch new deposits
+        try:
+            # blocking RPC and database calls run in worker threads to keep the event loop free
+            deposit_logs = await asyncio.to_thread(DepositLogs, active_deposits)
+            await asyncio.to_thread(deposit_logs.fetch_logs)
+            depositlogs = await asyncio.to_thread(database.get_newdepositlogs)  # Fetch logs with transfer == False
+            if depositlogs:
+                logger.info(f"************ Found new deposits: {depositlogs}")
+            else:
+                logger.info(f"############ No new deposits found")
+        except Exception as e:
+            logger.error(f"Error handling deposit logs: {str(e)}")
+            return
 
-            # Fetch recent deposits
+        # Process new deposit logs if available
+        if depositlogs:
+            response_data = []
             try:
-                all_balances = api.get_recent_deposits(number_of_batches)
+                response_data = [
+                    {
+                        'deposit_address': deposit['to_address'],
+                        'asset': 'USDT',
+                        'txid': deposit['from_address'],
+                        'amount': deposit['amount'],
+                        'refid': deposit['transaction_id'],  # Unique identifier of the deposit transaction
+                        'credit_time_timestamp': deposit['block_timestamp'],
+                        'credit_time': deposit['created_at']
+                    }
+                    for deposit in depositlogs
+                ]
             except Exception as e:
-                logger.error(f"Failed to fetch recent deposits: {str(e)}")
-                continue
+                logger.error(f"Error building response_data: {str(e)}")
+                return
 
-            # Filter active deposits (balances > 0)
-            active_deposits = []
+            # Launch async task for processing transfers, unless the one of an earlier run is still transferring
             try:
-                for balance in all_balances:
-                    if balance['balance'] > 0:
-                        row = {
-                            'deposit_address': balance['deposit_address'],
-                            'balance': balance['balance']
-                        }
-                        active_deposits.append(row)
-                if active_deposits:
-                    logger.info(f"New deposits found: {len(active_deposits)}")
+                transfer_task = job_data.get('transfer_task')
+                if transfer_task is None or transfer_task.done():
+                    job_data['transfer_task'] = context.application.create_task(process_transfers(response_data))
+                else:
+                    logger.info("Transfers of an earlier poll still running, new deposits are transferred by a later poll")
             except Exception as e:
-                logger.error(f"Error processing deposit balances: {str(e)}")
-                continue
+                logger.error(f"Error creating async task for process_transfers: {str(e)}")
+                # This error shouldn't block further operations since the task is fire-and-forget.
 
-            # Insert deposit logs and fetch new deposits
+            # Await deposit stack processing, deposits processed on earlier polls are skipped
             try:
-                deposit_logs = DepositLogs(active_deposits)
-                deposit_logs.fetch_logs()
-                depositlogs = database.get_newdepositlogs()  # Fetch logs with transfer == False
-                if depositlogs:
-                    logger.info(f"************ Found new deposits: {depositlogs}")
-                else:
-                    logger.info(f"############ No new deposits found")
+                new_deposits = [deposit for deposit in response_data if not depositstack.is_known_deposit(deposit['refid'])]
+                if new_deposits:
+                    await depositstack.receive_deposit(new_deposits)
             except Exception as e:
-                logger.error(f"Error handling deposit logs: {str(e)}")
-                continue
+                logger.error(f"Error awaiting depositstack.receive_deposit: {str(e)}")
+
+    except Exception as e:
+        logger.error(f"Unhandled error in poll_recent_deposits() job: {str(e)}")
+
+
+async def handle_referral_code_input(update: Update, context: CallbackContext, chat_id, text):
+    """
+    Handles the referral or bonus code the user entered before a deposit.
+
+    Args:
+        update (Update): The incoming update object containing message information.
+        context (CallbackContext): The context object for handling the conversation.
+        chat_id (int): The ID of the chat.
+        text (str): The text the user entered.
+    """
+    user_data = context.user_data
+    referral_code = text
+    if referral_code.lower() == 'skip':
+        logger.info(f"Customer skipped referral code by typing 'skip' and continues in depositing without bonus.")
+        user_data['status'] = None
+        await update.message.reply_text(f"Please wait while your deposit address is being prepared...") 
+        client = get_client(update, context)
+        deposit_request = await depositstack.add_deposit_request(update, client, referral=referral_code)
+        return
+    # the DataHandler calls are blocking, run them in worker threads to keep the event loop free
+    if await asyncio.to_thread(database.validate_referral, p_referral=referral_code):
+        logger.info(f"✅  Deposit referral code '{referral_code}' is approved.")
+        user_data['status'] = None
+        await update.message.reply_text(f"✅ Your referral code '{referral_code}' was approved. \n\nPlease wait while your deposit address is being prepared...") 
+        client = get_client(update, context)
+        deposit_request = await depositstack.add_deposit_request(update, client, referral=referral_code)
+        return
+    multiplier = await asyncio.to_thread(database.validate_bonuscode, bonuscode=referral_code)
+    if multiplier:
+        logger.info(f"✅  Deposit bonus code '{referral_code}' is approved.")
+        user_data['status'] = None
+        await update.message.reply_text(f"✅ Your bonus code '{referral_code}' was approved. \n\nPlease wait while your deposit address is being prepared...") 
+        client = get_client(update, context)
+        referral_code = f"!bonuscode?{referral_code}"
+        deposit_request = await depositstack.add_deposit_request(update, client, referral=referral_code, multiplier=multiplier)
+    else:
+        user_data['status'] = ACTION_ENTER_REFERRAL_CODE  # client_ask_referral
+        await update.message.reply_text(f"🚫 Your referral code '{referral_code}' is invalid.\n\nTry to enter the correct code again or write '<b><i>skip</i></b>' to continue without referral code or write '<b><i>cancel</i></b>' to abort the entire deposit process:", parse_mode='HTML') 
+
+
+async def handle_withdrawal_amount_input(update: Update, context: CallbackContext, chat_id, text):
+    """
+    Handles the withdrawal amount the user entered and asks for the wallet address if the amount is valid.
+
+    Args:
+        update (Update): The incoming update object containing message information.
+        context (CallbackContext): The context object for handling the conversation.
+        chat_id (int): The ID of the chat.
+        text (str): The text the user entered.
+    """
+    user_data = context.user_data
+    try:
+        amount = float(text)
+        user_data['status'] = ''  # Reset status after successfully parsing amount
+        balance_raw = await get_factorized_balance(update, context)
+        if balance_raw == -1: # if get_balance failed, server probably not online, therefore cancel process
+            user_data['status'] = None
+            await update.message.reply_text("Withdrawal process was canceled. Please try later again.")
+            return
+
+        logger.debug("RESULT: %s", balance_raw)
+        if balance_raw:
+            balance = float(balance_raw)
+            if amount > balance:
+                await update.message.reply_text(f"The requested withdrawal amount {amount} exceeds your balance of {balance}. Please enter a lower amount or write 'cancel' to cancel the withdrawal.")
+                user_data['status'] = STATUS_AWAITING_WITHDRAWAL_AMOUNT
+            elif amount == 0:
+                await update.message.reply_text(f"The requested withdrawal amount {amount} must not be 0. Please enter a valid amount or write 'cancel' to cancel the withdrawal.")
+                user_data['status'] = STATUS_AWAITING_WITHDRAWAL_AMOUNT
+            elif amount < 0:
+                await update.message.reply_text(f"The requested withdrawal amount {amount} must not be negative. Please enter a valid amount or write 'cancel' to cancel the withdrawal.")
+                user_data['status'] = STATUS_AWAITING_WITHDRAWAL_AMOUNT
+            else:
+                withdrawals.update_amount(chat_id, amount)
+                message = "Now, please enter your MATIC wallet address or write 'cancel' to cancel the withdrawal:"
+                user_data['status'] = STATUS_AWAITING_WITHDRAWAL_WALLET
+                await depositstack.bot_message(chat_id=chat_id, message=message)
+    except ValueError:
+        await update.message.reply_text("Please enter a valid amount or write 'cancel' to cancel the withdrawal.")
+
+
+async def handle_withdrawal_wallet_input(update: Update, context: CallbackContext, chat_id, text):
+    """
+    Handles the wallet address the user entered for a withdrawal and asks for confirmation if it is valid.
+
+    Args:
+        update (Update): The incoming update object containing message information.
+        context (CallbackContext): The context object for handling the conversation.
+        chat_id (int): The ID of the chat.
+        text (str): The text the user entered.
+    """
+    logger.debug('AWAITING WALLET')
+    wallet_address = text
+    is_valid_wallet_address = await validate_address(wallet_address, chat_id)
+    logger.info(f"is_valid_wallet_address: {is_valid_wallet_address}")
+    if not is_valid_wallet_address:
+        message = f"The wallet address '{wallet_address}' you entered is not a valid USDT/ERC20 wallet address.\nPlease enter a correct wallet address or write 'cancel' to cancel the process entirely."
+        await depositstack.bot_message(chat_id=chat_id, message=message)
+        context.user_data['status'] = STATUS_AWAITING_WITHDRAWAL_WALLET
+        return
+    withdrawals.update_wallet(chat_id, wallet_address)
+    await client_confirm_withdrawal(chat_id, context)
+
+
+# maps the conversation status to the handler of the text the user enters in that status
+TEXT_INPUT_HANDLERS = {
+    ACTION_ENTER_REFERRAL_CODE: handle_referral_code_input,
+    STATUS_AWAITING_WITHDRAWAL_AMOUNT: handle_withdrawal_amount_input,
+    STATUS_AWAITING_WITHDRAWAL_WALLET: handle_withdrawal_wallet_input,
+}
 
-            # Process new deposit logs if available
-            if depositlogs:
-                response_data = []
-                try:
-                    for deposit in depositlogs:
-                        row = {
-                            'deposit_address': deposit['to_address'],
-                            'asset': 'USDT',
-                            'txid': deposit['from_address'],
-                            'amount': deposit['amount'],
-                            'refid': deposit['transaction_id'],  # Unique identifier of the deposit transaction
-                            'credit_time_timestamp': deposit['block_timestamp'],
-                            'credit_time': deposit['created_at']
-                        }
-                        response_data.append(row)
-                except Exception as e:
-                    logger.error(f"Error building response_data: {str(e)}")
-                    continue
-
-                # Launch async task for processing transfers
-                try:
-                    asyncio.create_task(process_transfers(response_data))
-                except Exception as e:
-                    logger.error(f"Error creating async task for process_transfers: {str(e)}")
-                    # This error shouldn't block further operations since the task is fire-and-forget.
-
-                # Await deposit stack processing
-                try:
-                    await depositstack.receive_deposit(response_data)
-                except Exception as e:
-                    logger.error(f"Error awaiting depositstack.receive_deposit: {str(e)}")
-                    continue
-
-            # Check for shutdown event
-            if application.shutdown_event.is_set():
-                logger.warning(f"*** poll_recent_deposits() thread halted because of shutdown signal. ***")
-                break
-
-        except asyncio.CancelledError:
-            logger.info("poll_recent_deposits() was cancelled.")
-            break
-        except Exception as e:
-            logger.error(f"Unhandled error in poll_recent_deposits() co-routine: {str(e)}")
-            await asyncio.sleep(CONFIG.DEPOSIT_POLLING_INTERVAL)
- 
 
 async def handle_text_input(update: Update, context: CallbackContext):
     """
     Handles text input from the user during a specific operation, such as withdrawal.
+    The input is passed to the handler registered for the current status in TEXT_INPUT_HANDLERS,
+    text sent while no operation is ongoing is ignored.
 
     Args:
         update (Update): The incoming update object containing message information.
@@ -1709,97 +1915,22 @@ async def handle_text_input(update: Update, context: CallbackContext):
     """
     try:
         chat_id = update.message.chat_id
+        text = update.message.text
         user_data = context.user_data
+        status = user_data.get('status')
 
         # Cancel the ongoing operation if the user types 'cancel'
-        if update.message.text == 'cancel':
-            if 'status' not in user_data:
+        if text == 'cancel':
+            if status is not None:
+                await update.message.reply_text(f'The current operation "{status}" was canceled.')
                 user_data['status'] = None
-            if user_data['status'] is not None:
-                await update.message.reply_text(f'The current operation "{user_data["status"]}" was canceled.')
-                context.user_data['status'] = None
             else:
                 await update.message.reply_text("Nothing to cancel: No ongoing operation.")
             return
-        if user_data.get('status') == Workflows.RequestDeposit.ERC_3['function']:  # enter_referral_code
-            referral_code = update.message.text
-            if referral_code.lower() == 'skip':
-                logger.info(f"Customer skipped referral code by typing 'skip' and continues in depositing without bonus.")
-                user_data['status'] = None
-                await update.message.reply_text(f"Please wait while your deposit address is being prepared...") 
-                client = get_client_object(update, chat_id)
-                deposit_request = await depositstack.add_deposit_request(update, client, referral=referral_code)
-                return
-            if database.validate_referral(p_referral=referral_code):
-                logger.info(f"✅  Deposit referral code '{referral_code}' is approved.")
-                user_data['status'] = None
-                await update.message.reply_text(f"✅ Your referral code '{referral_code}' was approved. \n\nPlease wait while your deposit address is being prepared...") 
-                client = get_client_object(update, chat_id)
-                deposit_request = await depositstack.add_deposit_request(update, client, referral=referral_code)
-                return
-            if referral_code:
-                multiplier = database.validate_bonuscode(bonuscode=referral_code)
-            if multiplier:
-                logger.info(f"✅  Deposit bonus code '{referral_code}' is approved.")
-                user_data['status'] = None
-                await update.message.reply_text(f"✅ Your bonus code '{referral_code}' was approved. \n\nPlease wait while your deposit address is being prepared...") 
-                client = get_client_object(update, chat_id)
-                referral_code = f"!bonuscode?{referral_code}"
-                deposit_request = await depositstack.add_deposit_request(update, client, referral=referral_code, multiplier=multiplier)
-                return
-            else:
-                user_data['status'] = Workflows.RequestDeposit.ERC_3['function']  # client_ask_referral
-                await update.message.reply_text(f"🚫 Your referral code '{referral_code}' is invalid.\n\nTry to enter the correct code again or write '<b><i>skip</i></b>' to continue without referral code or write '<b><i>cancel</i></b>' to abort the entire deposit process:", parse_mode='HTML') 
-                return
 
-        # Handle withdrawal amount input if the user is in 'withdrawal: awaiting amount' status
-        if user_data.get('status') == 'withdrawal: awaiting amount':
-            if update.message.text:
-                amount_text = update.message.text
-                try:
-                    amount = float(amount_text)
-                    context.user_data['status'] = ''  # Reset status after successfully parsing amount
-                    balance_raw = await get_factorized_balance(update, context)
-                    if balance_raw == -1: # if get_balance failed, server probably not online, therefore cancel process
-                        user_data = context.user_data
-                        user_data['status'] = None
-                        await update.message.reply_text("Withdrawal process was canceled. Please try later again.")
-                        return
-
-                    print(f"\n\n\n\nRESULT:\n{balance_raw}")
-                    if balance_raw:
-                        balance = float(balance_raw)
-                        if amount > balance:
-                            await update.message.reply_text(f"The requested withdrawal amount {amount} exceeds your balance of {balance}. Please enter a lower amount or write 'cancel' to cancel the withdrawal.")
-                            context.user_data['status'] = 'withdrawal: awaiting amount'
-                        elif amount == 0:
-                            await update.message.reply_text(f"The requested withdrawal amount {amount} must not be 0. Please enter a valid amount or write 'cancel' to cancel the withdrawal.")
-                            context.user_data['status'] = 'withdrawal: awaiting amount'
-                        elif amount < 0:
-                            await update.message.reply_text(f"The requested withdrawal amount {amount} must not be negative. Please enter a valid amount or write 'cancel' to cancel the withdrawal.")
-                            context.user_data['status'] = 'withdrawal: awaiting amount'
-                        else:
-                            withdrawals.update_amount(chat_id, amount)
-                            message = "Now, please enter your MATIC wallet address or write 'cancel' to cancel the withdrawal:"
-                            context.user_data['status'] = 'withdrawal: awaiting wallet'
-                            await depositstack.bot_message(chat_id=chat_id, message=message)
-                except ValueError:
-                    await update.message.reply_text("Please enter a valid amount or write 'cancel' to cancel the withdrawal.")
-
-        # Handle wallet address input if the user is in 'withdrawal: awaiting wallet' status
-        elif user_data.get('status') == 'withdrawal: awaiting wallet':
-            logger.info('AWAITING WALLET!!!!')
-            if update.message.text:
-                wallet_address = update.message.text
-                is_valid_wallet_address = await validate_address(wallet_address, chat_id)
-                logger.info(f"is_valid_wallet_address: {is_valid_wallet_address}")
-                if not is_valid_wallet_address:
-                    message = f"The wallet address '{wallet_address}' you entered is not a valid USDT/ERC20 wallet address.\nPlease enter a correct wallet address or write 'cancel' to cancel the process entirely."
-                    await depositstack.bot_message(chat_id=chat_id, message=message)
-                    context.user_data['status'] = 'withdrawal: awaiting wallet'
-                    return
-                withdrawals.update_wallet(chat_id, wallet_address)
-                await client_confirm_withdrawal(chat_id, context)
+        handler = TEXT_INPUT_HANDLERS.get(status)
+        if handler and text:
+            await handler(update, context, chat_id, text)
     
     except Exception as e:
         error_message = f"Error occurred in handling text input: {str(e)}"
@@ -1808,6 +1939,16 @@ async def handle_text_input(update: Update, context: CallbackContext):
 
 
 
+async def close_http_client(app: Application) -> None:
+    """
+    Closes the shared HTTP client session. Registered as post_shutdown hook of the application.
+
+    Args:
+        app (Application): The Telegram bot application.
+    """
+    await HTTPClient.close()
+
+
 def start_telegram_bot():
     """
     Starts the Telegram bot application with configured command and message handlers.
@@ -1826,13 +1967,14 @@ def start_telegram_bot():
         # global application
         # application = Application.builder().token(CONFIG.TELEGRAM_KEY).build()
 
-        # Add command handlers
-        application.add_handler(CommandHandler("start", lambda update, context: execute_workflow_action(update, context, Workflows.Start.MENU_0['function'])))
-        application.add_handler(CommandHandler("deposit", lambda update, context: execute_workflow_action(update, context, Workflows.RequestDeposit.SDA_0['function'])))
-        application.add_handler(CommandHandler("balance", lambda update, context: execute_workflow_action(update, context, Workflows.GetBalance.GEB_0['function'])))
-        application.add_handler(CommandHandler("withdraw", lambda update, context: execute_workflow_action(update, context, Workflows.Withdraw.WDR_0['function'])))
-        application.add_handler(CommandHandler("referral", lambda update, context: execute_workflow_action(update, context, Workflows.GetReferralCode.GRC_0['function'])))
-        application.add_handler(CommandHandler("help", lambda update, context: execute_workflow_action(update, context, Workflows.GetHelp.HLP_0['function'])))
+        # Add command handlers (the lambdas close over a local instead of looking up the global on every call)
+        exec_wf = execute_workflow_action
+        application.add_handler(CommandHandler("start", lambda update, context: exec_wf(update, context, ACTION_START)))
+        application.add_handler(CommandHandler("deposit", lambda update, context: exec_wf(update, context, ACTION_SHOW_DEPOSIT_ADDRESS)))
+        application.add_handler(CommandHandler("balance", lambda update, context: exec_wf(update, context, ACTION_SHOW_BALANCE)))
+        application.add_handler(CommandHandler("withdraw", lambda update, context: exec_wf(update, context, ACTION_REQUEST_WITHDRAWAL)))
+        application.add_handler(CommandHandler("referral", lambda update, context: exec_wf(update, context, ACTION_SHOW_REFERRAL_CODE)))
+        application.add_handler(CommandHandler("help", lambda update, context: exec_wf(update, context, ACTION_SHOW_COMMAND_LIST)))
 
         # Add callback query handler
         application.add_handler(CallbackQueryHandler(button))
@@ -1840,6 +1982,26 @@ def start_telegram_bot():
         # Add text message handler
         application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_input))
 
+        # Close the shared HTTP client session on the bot's loop, where it was created
+        application.post_shutdown = close_http_client
+
+        # Schedule the deposit pollers on the bot's JobQueue
+        if application.job_queue is None:
+            raise Exception("JobQueue is not available. Install python-telegram-bot[job-queue].")
+        application.job_queue.run_repeating(
+            poll_recent_deposits,
+            interval=CONFIG.DEPOSIT_POLLING_INTERVAL,
+            first=CONFIG.DEPOSIT_POLLING_INTERVAL,
+            data={'cycle_episode': 0, 'api': EthAPI()},
+            name='poll_recent_deposits'
+        )
+        application.job_queue.run_repeating(
+            poll_deposit_request_stack,
+            interval=CONFIG.DEPOSIT_REQUEST_STACK_INTERVAL,
+            first=0,
+            name='poll_deposit_request_stack'
+        )
+
         # Start the Telegram bot polling in an async-friendly way
         application.run_polling(stop_signals=None, close_loop=False)  # Disable default signal handling
         
@@ -1857,18 +2019,16 @@ def main():
     """
     Main entry point to start the application.
 
-    This function starts multiple threads for different components of the application:
-    - FastAPI server using a separate thread.
-    - Polling recent deposits using another thread.
-    - Polling deposit request stack using a third thread.
-    Finally, it starts the Telegram bot in the main thread and waits for the deposit polling thread to finish.
+    This function starts the FastAPI server in a separate thread and then starts the Telegram bot
+    in the main thread. Polling recent deposits and polling the deposit request stack run as
+    repeating jobs on the Telegram bot's JobQueue (see start_telegram_bot).
 
     Raises:
         Exception: If there is an unexpected error during thread creation or bot startup.
     """
 
 
-    global thread_fastapi, thread_deposits, thread_deposit_request_stack
+    global thread_fastapi
 
     loop = asyncio.get_event_loop()
 
@@ -1878,8 +2038,6 @@ def main():
         with executor:
             # submit tasks to run in background as separate threads
             executor.submit(run_fastapi)
-            executor.submit(poll_recent_deposits_wrapper)
-            executor.submit(poll_deposit_request_stack_wrapper)
 
             # Start the Telegram bot in the main thread
             start_telegram_bot()
@@ -1893,60 +2051,15 @@ def main():
         loop.run_until_complete(shutdown())
 
 
-def poll_recent_deposits_wrapper():
-    """
-    Wrapper function to run the poll_recent_deposits coroutine in a dedicated event loop.
-
-    This function creates a new asyncio event loop, sets it as the current loop,
-    and runs the poll_recent_deposits coroutine within this loop. It ensures proper
-    setup and cleanup of the event loop environment.
-
-    Raises:
-        Exception: If there is an unexpected error during event loop creation or execution.
-    """
-    # Create an asyncio event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-
-    try:
-        # Run the poll_recent_deposits coroutine in the event loop
-        loop.run_until_complete(poll_recent_deposits())
-    
-    finally:
-        # Ensure the event loop is closed after execution
-        loop.close()
-
-
-def poll_deposit_request_stack_wrapper():
-    """
-    Wrapper function to run the poll_deposit_request_stack coroutine in a dedicated event loop.
-
-    This function creates a new asyncio event loop, sets it as the current loop,
-    and runs the poll_deposit_request_stack coroutine within this loop. It ensures proper
-    setup and cleanup of the event loop environment.
-
-    Raises:
-        Exception: If there is an unexpected error during event loop creation or execution.
-    """
-    # Create an asyncio event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-
-    try:
-        # Run the poll_deposit_request_stack coroutine in the event loop
-        loop.run_until_complete(poll_deposit_request_stack())
-    
-    finally:
-        # Ensure the event loop is closed after execution
-        loop.close()
-
 def run_fastapi():
     """
     Function to run the FastAPI application using uvicorn.
     This function starts the FastAPI application on the specified host and port.
     """
     try:
-        config = uvicorn.Config("main:app", host="127.0.0.1", port=8000, workers=4)
+        # pass the imported app object: a "main:app" import string would import main.py a second time,
+        # with its own database, caches and bot objects, because this module runs as __main__
+        config = uvicorn.Config(app, host="127.0.0.1", port=8000)
         global uvicorn_server
         uvicorn_server = uvicorn.Server(config)
         uvicorn_server.run()
@@ -1979,6 +2092,9 @@ async def shutdown():
     except Exception as e:
         logger.error(f"Error during FastAPI shutdown: {e}")
 
+    # Close the shared HTTP client session (no-op if post_shutdown already closed it)
+    await HTTPClient.close()
+
     # Shutdown ThreadPoolExecutor
     if executor:
         logger.info("Shutting down ThreadPoolExecutor...")
@@ -1,15 +1,108 @@
 # model.py
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import psycopg2
 from decimal import Decimal
 from psycopg2.extras import RealDictRow
 import psycopg2.extras
+import psycopg2.pool
+import psycopg2.errors
+import threading
+import os
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from itertools import count
+from cachetools import TTLCache
 import logging
 import argparse
 from config import CONFIG
 
 DBCONF = CONFIG.DBCONFIG
 
+# numbers the server-side cursors opened by call_function_iter, names must be unique per connection
+server_cursor_ids = count(1)
+
+# numbers the prepared statements, names must be unique per connection
+prepared_statement_ids = count(1)
+
+# reads numeric columns as float instead of Decimal, only registered on cursors of display-only queries
+DEC2FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values,
+    'DEC2FLOAT',
+    lambda value, cursor: float(value) if value is not None else None
+)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter applying default connect and read timeouts to every request sent through it,
+    requests has no session-wide timeout and without one a hung Returns server app blocks the
+    calling thread indefinitely. A timeout passed to the request itself takes precedence.
+    """
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = (CONFIG.HTTP.CONNECT_TIMEOUT, CONFIG.HTTP.TIMEOUT)
+        return super().send(request, **kwargs)
+
+
+def db_call(method):
+    """
+    Decorator for the DataHandler database methods: logs any exception raised by the
+    decorated method and returns None instead, so the methods don't each need their
+    own try/except block.
+
+    Args:
+        method (function): The DataHandler method to decorate.
+
+    Returns:
+        function: The decorated method.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except Exception as e:
+            logging.error("Error in DataHandler.%s%r: %s", method.__name__, args, e)
+            return  None
+    return wrapper
+
+
+@lru_cache(maxsize=128)
+def build_statement(command, name, arity):
+    """
+    Builds a statement like "CALL proc(%s, %s)" or "EXECUTE p_func_2(%s, %s)" once per
+    (command, name, arity); repeated calls return the cached string.
+
+    Args:
+        command (str): The SQL command, e.g. 'CALL' or 'EXECUTE'.
+        name (str): The name of the procedure or prepared statement.
+        arity (int): The number of parameters.
+
+    Returns:
+        str: The statement with one %s placeholder per parameter.
+    """
+    if command == 'EXECUTE' and arity == 0:
+        return f"EXECUTE {name}"  # EXECUTE doesn't accept an empty parameter list
+    return f"{command} {name}({', '.join(['%s'] * arity)})"
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """
+    psycopg2 connection that remembers the server-side prepared statements created on it.
+    Prepared statements live as long as the database session, so the names are kept on
+    the connection itself and survive the connection being handed out again by the pool.
+
+    Attributes:
+        prepared (dict): Maps (func_name, arity) to the name of the prepared statement.
+        stale (list): Names of invalidated prepared statements, deallocated before the next PREPARE.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = {}
+        self.stale = []
+
 class DataHandler:
     """
     Facilitates database operations for the bot commands by invoking stored procedures
@@ -18,43 +111,203 @@ class DataHandler:
     Methods:
         - call_procedure(proc_name, *args): Executes a stored procedure with the given name and arguments.
         - call_function(func_name, *args): Invokes a stored function with the provided name and arguments.
+        - call_function_iter(func_name, *args): Invokes a stored function and yields its rows from a server-side cursor.
         - import_csv_data(csv_path): Imports CSV data into the database using the 'import_csv_data' procedure.
+        - import_csv_data_copy(csv_path, table): Streams CSV data into the database with COPY ... FROM STDIN.
         - add_deposit_record(p_refid, p_chat_id, p_firstname, p_lastname, p_amount, p_asset, p_txid, p_deposit_address):
           Adds a deposit record to the 'deposits' table.
+        - record_deposit(p_refid, ...): Adds a deposit record unless it exists, returns whether it was added.
+        - add_deposit_records_bulk(rows): Adds several deposit records to the 'deposits' table at once.
         - check_if_deposit_processed(p_refid): Checks if a deposit with the given refid has been processed.
+        - get_processed_deposits(p_refids): Returns the refids of the given list that have been processed.
         - compound_returns(p_current_date): Compounds returns and updates balances based on the given date.
         - correct_balance(p_chat_id, p_amount): Corrects the balance and logs the correction in the ledger.
         - handle_deposit(p_chat_id, p_firstname, p_lastname, p_currency, p_method, p_amount, p_deposit_address,
                          p_kraken_refid, p_kraken_time, p_kraken_txid):
           Handles a deposit transaction, updates balances, and logs the transaction in the ledger.
-        - get_statement(p_chat_id, p_start_date, p_end_date): Retrieves transaction statements between two dates.
+        - get_statement(p_chat_id, p_start_date, p_end_date): Streams transaction statements between two dates.
         - get_total_liabilities(): Calculates the total liabilities from the 'balances' table.
         - projected_balance(p_target_date, p_chat_id): Calculates projected balance up to a target date for a client.
         - get_balance(p_chat_id): Retrieves the current balance information for a client.
         - get_client(p_chat_id): Retrieves client information based on the chat_id.
 
-        - close(): Closes the database connection.
+        - transaction(): Context manager running the enclosed calls in a single transaction.
+        - close(): Returns the database connection to the connection pool.
+
+    DataHandler instances borrow their connection from a connection pool shared by all
+    instances, so creating a DataHandler doesn't pay the connection setup on every bot command.
+    DataHandler can be used as a context manager (with DataHandler() as db: ...) so the
+    connection is always given back to the pool.
     """
+    _pool: psycopg2.pool.ThreadedConnectionPool = None
+    _pool_lock = threading.Lock()
+    _http_session: requests.Session = None
+    # the deposit and central addresses rarely change, they are cached for all instances
+    _cache_lock = threading.Lock()
+    _deposit_addresses_cache = TTLCache(maxsize=1, ttl=CONFIG.DEPOSIT_ADDR_CACHE_TTL)
+    _central_address_cache = TTLCache(maxsize=1, ttl=CONFIG.CENTRAL_ADDR_CACHE_TTL)
+    # deposit address -> private key, the same addresses are swept over and over
+    _private_key_cache = TTLCache(maxsize=1024, ttl=CONFIG.PRIVATE_KEY_CACHE_TTL)
+    # total liabilities sum up all balances, the admin paths can live with a slightly older figure
+    _total_liabilities_cache = TTLCache(maxsize=1, ttl=CONFIG.TOTAL_LIABILITIES_CACHE_TTL)
+
+    @classmethod
+    def get_pool(cls) -> psycopg2.pool.ThreadedConnectionPool:
+        """
+        Returns the connection pool shared by all DataHandler instances, creating it on first use.
+
+        Returns:
+            psycopg2.pool.ThreadedConnectionPool: The shared connection pool.
+        """
+        with cls._pool_lock:
+            if cls._pool is None or cls._pool.closed:
+                cls._pool = psycopg2.pool.ThreadedConnectionPool(
+                    minconn=DBCONF.POOL_MINCONN,
+                    maxconn=DBCONF.POOL_MAXCONN,
+                    dbname=DBCONF.DBNAME,
+                    user=DBCONF.USER,
+                    password=DBCONF.PASSWORD,
+                    host=cls.get_host(),
+                    port=DBCONF.PORT,
+                    connection_factory=PreparingConnection,
+                    # session timeouts are passed with the connection startup, no extra round-trip needed
+                    options=(
+                        f"-c statement_timeout={DBCONF.STATEMENT_TIMEOUT} "
+                        f"-c idle_in_transaction_session_timeout={DBCONF.IDLE_IN_TRANSACTION_TIMEOUT} "
+                        f"-c lock_timeout={DBCONF.LOCK_TIMEOUT}"
+                    )
+                )
+                logging.info("Database connection pool created")
+            return cls._pool
+
+
+    @classmethod
+    def http_session(cls) -> requests.Session:
+        """
+        Returns the requests session shared by all DataHandler instances for the calls to the
+        Returns server app, creating it on first use. Its connections are kept alive and reused,
+        so the calls don't open a new connection each time.
+
+        Returns:
+            requests.Session: The shared session.
+        """
+        if cls._http_session is None:
+            with cls._pool_lock:
+                if cls._http_session is None:
+                    session = requests.Session()
+                    adapter = TimeoutHTTPAdapter(
+                        pool_connections=10,
+                        pool_maxsize=CONFIG.HTTP.MAX_CONNECTIONS_PER_HOST,
+                        max_retries=Retry(total=3, backoff_factor=0.2)  # idempotent requests only, POSTs aren't retried
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    cls._http_session = session
+        return cls._http_session
+
+
+    @staticmethod
+    def get_host() -> str:
+        """
+        Returns the host the connection pool connects to. If the database runs on this
+        machine and its Unix domain socket directory exists, the socket directory is returned,
+        so connections go through the Unix socket instead of the loopback TCP stack.
+
+        Returns:
+            str: DBCONF.SOCKET_DIR for a local database with a socket directory, DBCONF.HOST otherwise.
+        """
+        if DBCONF.HOST in ('localhost', '127.0.0.1') and os.path.isdir(DBCONF.SOCKET_DIR):
+            return DBCONF.SOCKET_DIR
+        return DBCONF.HOST
+
+
     def __init__(self) -> None:
         """
-        Initializes the DataHandler object by establishing a connection to the database.
+        Initializes the DataHandler object. The connection is borrowed from the connection pool
+        on first use (see conn), so a DataHandler that never queries the database doesn't take one.
+        """
+        self._conn = None
+        self._in_transaction = False
+        # one RealDictCursor is reused for all calls, the lock keeps threads sharing this DataHandler off it at the same time
+        self._cursor = None
+        self._cursor_lock = threading.RLock()
+
+
+    @property
+    def conn(self):
+        """
+        The database connection of this DataHandler, borrowed from the connection pool on first use.
+
+        Returns:
+            connection or None: The database connection, None if it couldn't be established.
 
         Raises:
             Exception: If there is an error connecting to the database.
         """
-        try:
-            self.conn = psycopg2.connect(
-                dbname=DBCONF.DBNAME,
-                user=DBCONF.USER,
-                password=DBCONF.PASSWORD,
-                host=DBCONF.HOST,
-                port=DBCONF.PORT
-            )
-            self.conn.autocommit = True
-            logging.info("Database connection established")
-        except Exception as e:
-            logging.error(f"Error connecting to the database: {e}")
-            return  None
+        if self._conn is None:
+            with self._cursor_lock:
+                if self._conn is None:
+                    try:
+                        conn = self.get_pool().getconn()
+                        conn.autocommit = True
+                        self._conn = conn
+                        logging.info("Database connection established")
+                    except Exception as e:
+                        logging.error(f"Error connecting to the database: {e}")
+        return self._conn
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    def dict_cursor(self):
+        """
+        Returns the RealDictCursor reused by call_procedure and call_function, creating it if
+        it doesn't exist yet or was closed. Callers must hold self._cursor_lock.
+
+        Returns:
+            RealDictCursor: The reused cursor of this DataHandler's connection.
+        """
+        if self._cursor is None or self._cursor.closed:
+            self._cursor = self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        return self._cursor
+
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the enclosed database calls in one transaction instead of one transaction per call.
+        The transaction is committed when the block completes and rolled back if it raises.
+
+        Usage:
+            with data.transaction():
+                data.call_procedure(...)
+                data.call_procedure(...)
+
+        The connection is locked for the whole block, calls from other threads on this
+        DataHandler wait until the transaction is committed or rolled back instead of
+        running inside it.
+
+        Raises:
+            Exception: Any exception raised inside the block, after rolling back the transaction.
+        """
+        with self._cursor_lock:
+            self.conn.autocommit = False
+            self._in_transaction = True
+            try:
+                yield self
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            finally:
+                self._in_transaction = False
+                self.conn.autocommit = True
 
 
     def call_procedure(self, proc_name, *args):
@@ -73,10 +326,10 @@ class DataHandler:
             Exception: If there is an error executing the stored procedure.
         """
         try:
-            with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                # Construct the CALL statement for procedures
-                call_statement = f"CALL {proc_name}({', '.join('%s' for _ in args)})"
-                cursor.execute(call_statement, args)
+            with self._cursor_lock:
+                cursor = self.dict_cursor()
+                # The CALL statement for procedures is built once per (proc_name, number of args)
+                cursor.execute(build_statement('CALL', proc_name, len(args)), args)
                 
                 # Try to fetch the results if there are any
                 try:
@@ -88,7 +341,7 @@ class DataHandler:
                 return result
             
         except Exception as e:
-            logging.error(f"Error calling procedure {proc_name}: {e}")
+            logging.error("Error calling procedure %s: %s", proc_name, e)
             return  None
 
 
@@ -108,39 +361,192 @@ class DataHandler:
             Exception: If there is an error executing the stored function.
         """
         try:
-            with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                cursor.callproc(func_name, args)
-                self.conn.commit()
+            with self._cursor_lock:
+                cursor = self.dict_cursor()
+                # the function call is parsed and planned once per connection, later calls only execute it
+                # no commit needed: the connection runs in autocommit mode, inside transaction() the block commits
+                self.execute_function(cursor, func_name, args)
                 result = cursor.fetchall()
                 return result
         except Exception as e:
-            logging.error(f"Error calling function {func_name}: {e}")
+            logging.error("Error calling function %s: %s", func_name, e)
             return  None
 
 
 
+    def call_function_iter(self, func_name, *args, itersize=DBCONF.STATEMENT_ITERSIZE, float_numerics=False):
+        """
+        Executes a stored function and yields its rows as they are fetched from a
+        server-side cursor, itersize rows per round-trip, instead of loading all rows at once.
+        The connection is only locked while a batch of rows is fetched, not while the caller
+        works on the rows, so a partly consumed iteration doesn't block other threads.
+
+        Args:
+            func_name (str): The name of the stored function to execute.
+            *args: Variable length argument list for function parameters.
+            itersize (int): Number of rows fetched per round-trip.
+            float_numerics (bool): Return numeric columns as float instead of Decimal.
+                Only for results that are displayed, never for amounts that are calculated with.
+
+        Yields:
+            dict: The result rows with column names as keys.
+
+        Raises:
+            psycopg2.Error: If the function can't be executed or its rows can't be fetched.
+        """
+        # named cursors are server-side cursors, WITH HOLD lets them live outside a transaction (autocommit)
+        with self._cursor_lock:
+            cursor = self.conn.cursor(name=f"iter_{func_name}_{next(server_cursor_ids)}", cursor_factory=psycopg2.extras.RealDictCursor, withhold=True)
+        try:
+            with self._cursor_lock:
+                if float_numerics:
+                    psycopg2.extensions.register_type(DEC2FLOAT, cursor)
+                cursor.execute(f"SELECT * FROM {func_name}({', '.join(['%s'] * len(args))})", args)
+            while True:
+                with self._cursor_lock:
+                    rows = cursor.fetchmany(itersize)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            with self._cursor_lock:
+                cursor.close()
+
+
+    def _call_function_scalar(self, func_name, *args):
+        """
+        Executes a stored function that returns a single value and returns that value.
+        Uses a plain tuple cursor, no dictionary is built for the single column.
+
+        Args:
+            func_name (str): The name of the stored function to execute.
+            *args: Variable length argument list for function parameters.
+
+        Returns:
+            Any: The first column of the first row, or None if there is no row or an error occurs.
+        """
+        try:
+            with self._cursor_lock, self.conn.cursor() as cursor:
+                self.execute_function(cursor, func_name, args)
+                row = cursor.fetchone()
+                return row[0] if row else None
+        except Exception as e:
+            logging.error("Error calling function %s: %s", func_name, e)
+            return  None
+
+
+    def execute_function(self, cursor, func_name, args):
+        """
+        Executes the prepared statement calling the given stored function with args on cursor.
+        If the prepared statement itself became unusable, e.g. after the function was replaced with
+        a different result type by dbinit.py, it is forgotten and prepared again on the next call.
+        Other errors, raised by the function or a timeout, leave the prepared statement in place.
+
+        Args:
+            cursor (cursor): Cursor of the current connection.
+            func_name (str): The name of the stored function.
+            args (tuple): The function parameters.
+
+        Raises:
+            psycopg2.Error: If the statement can't be prepared or executed.
+        """
+        statement_name = self.prepare_function(cursor, func_name, len(args))
+        try:
+            cursor.execute(build_statement('EXECUTE', statement_name, len(args)), args)
+        except psycopg2.errors.FeatureNotSupported:
+            # "cached plan must not change result type", the statement still exists on the server
+            self.conn.prepared.pop((func_name, len(args)), None)
+            self.conn.stale.append(statement_name)
+            raise
+        except psycopg2.errors.InvalidSqlStatementName:
+            # the statement doesn't exist on the server (anymore), there is nothing to deallocate
+            self.conn.prepared.pop((func_name, len(args)), None)
+            raise
+
+
+    def prepare_function(self, cursor, func_name, arity):
+        """
+        Returns the name of the prepared statement calling the given stored function,
+        preparing it on the current connection if it hasn't been prepared yet.
+
+        Args:
+            cursor (cursor): Cursor of the current connection.
+            func_name (str): The name of the stored function.
+            arity (int): The number of arguments the function is called with.
+
+        Returns:
+            str: The name of the prepared statement.
+        """
+        key = (func_name, arity)
+        statement_name = self.conn.prepared.get(key)
+        if statement_name is None:
+            # drop the statements invalidated by earlier calls; a name stays listed until its DEALLOCATE
+            # succeeded, so one that fails (e.g. inside an aborted transaction) is retried next time
+            while self.conn.stale:
+                cursor.execute(f"DEALLOCATE {self.conn.stale[-1]}")
+                self.conn.stale.pop()
+            # numbered, so a statement prepared again doesn't clash with one that couldn't be deallocated
+            statement_name = f"p_{func_name}_{arity}_{next(prepared_statement_ids)}"
+            placeholders = ', '.join(f"${i}" for i in range(1, arity + 1))
+            cursor.execute(f"PREPARE {statement_name} AS SELECT * FROM {func_name}({placeholders})")
+            self.conn.prepared[key] = statement_name
+        return statement_name
+
+
+    @db_call
     def import_csv_data(self, csv_path):
         """
-        Imports data from a CSV file into the database using a stored procedure.
+        Imports data from a CSV file into the database.
+        A file found on this machine is streamed with import_csv_data_copy(), otherwise csv_path
+        is taken as a path on the database server and the 'import_csv_data' stored procedure reads it.
 
         Args:
             csv_path (str): The path to the CSV file containing data to be imported.
 
         Returns:
-            list: List of dictionaries containing any results returned by the stored procedure.
-                Each dictionary represents a row of results with column names as keys.
+            int or list: Number of imported rows if the file was streamed, otherwise the list of
+                dictionaries containing any results returned by the stored procedure.
+
+        Raises:
+            Exception: If there is an error during the import process.
+        """
+        if os.path.isfile(csv_path):
+            return self.import_csv_data_copy(csv_path)
+        # Call the 'import_csv_data' stored procedure with the provided CSV path
+        return self.call_procedure("import_csv_data", csv_path)
+    
+
+    def import_csv_data_copy(self, csv_path, table="returns"):
+        """
+        Imports data from a CSV file by streaming it from this machine to the database with
+        COPY ... FROM STDIN. Unlike import_csv_data, the file doesn't have to be on the database
+        server and no server-side file access rights are needed.
+
+        Args:
+            csv_path (str): The path to the CSV file containing data to be imported.
+            table (str): The table to import into, defaults to 'returns'.
+
+        Returns:
+            int or None: Number of imported rows, or None if an error occurs.
 
         Raises:
             Exception: If there is an error during the import process.
         """
         try:
-            # Call the 'import_csv_data' stored procedure with the provided CSV path
-            return self.call_procedure("import_csv_data", csv_path)
+            with self.conn.cursor() as cursor, open(csv_path, 'rb') as csv_file:
+                cursor.copy_expert(
+                    f"COPY {table} (date, returns) FROM STDIN WITH (FORMAT CSV, HEADER TRUE, DELIMITER ',')",
+                    csv_file,
+                    size=DBCONF.COPY_BUFFER_SIZE  # bytes read from the file and sent per chunk
+                )
+                logging.info(f"CSV data imported successfully from {csv_path}: {cursor.rowcount} rows")
+                return cursor.rowcount
         except Exception as e:
             logging.error(f"Error importing CSV data from {csv_path}: {e}")
             return  None
-    
 
+
+    @db_call
     def add_deposit_record(self, p_refid, p_chat_id, p_firstname, p_lastname, p_amount, p_asset, p_txid, p_deposit_address):
         """
         Adds a deposit record to the database using a stored procedure.
@@ -162,14 +568,68 @@ class DataHandler:
         Raises:
             Exception: If there is an error while adding the deposit record.
         """
+        # Call the 'add_deposit_record' stored procedure with the provided parameters
+        return self.call_procedure("add_deposit_record", p_refid, p_chat_id, p_firstname, p_lastname, p_amount, p_asset, p_txid, p_deposit_address)
+    
+
+    @db_call
+    def record_deposit(self, p_refid, p_chat_id, p_firstname, p_lastname, p_amount, p_asset, p_txid, p_deposit_address):
+        """
+        Adds a deposit record unless the deposit has been recorded before, checking and
+        inserting in one round-trip with the 'record_deposit' function.
+
+        Args:
+            p_refid (str): Reference ID for the deposit.
+            p_chat_id (int): Chat ID associated with the user making the deposit.
+            p_firstname (str): First name of the user making the deposit.
+            p_lastname (str): Last name of the user making the deposit.
+            p_amount (float): Amount of the deposit.
+            p_asset (str): Asset type of the deposit (e.g., currency).
+            p_txid (str): Transaction ID associated with the deposit.
+            p_deposit_address (str): Deposit address used for the transaction.
+
+        Returns:
+            bool or None: True if the deposit was recorded now, False if it had been recorded before, None if an error occurs.
+
+        Raises:
+            Exception: If there is an error while recording the deposit.
+        """
+        # Call the 'record_deposit' function, it returns a single boolean
+        return self._call_function_scalar("record_deposit", p_refid, p_chat_id, p_firstname, p_lastname, p_amount, p_asset, p_txid, p_deposit_address)
+
+
+    def add_deposit_records_bulk(self, rows):
+        """
+        Adds several deposit records to the 'deposits' table with multi-row INSERT statements,
+        DBCONF.BULK_PAGE_SIZE rows per statement, instead of one add_deposit_record call per row.
+
+        Args:
+            rows (list of tuple): Deposit records as tuples of
+                (refid, chat_id, firstname, lastname, amount, asset, txid, deposit_address).
+
+        Returns:
+            int or None: Number of inserted rows, or None if an error occurs.
+
+        Raises:
+            Exception: If there is an error while adding the deposit records.
+        """
+        if not rows:
+            return 0
         try:
-            # Call the 'add_deposit_record' stored procedure with the provided parameters
-            return self.call_procedure("add_deposit_record", p_refid, p_chat_id, p_firstname, p_lastname, p_amount, p_asset, p_txid, p_deposit_address)
+            with self.conn.cursor() as cursor:
+                psycopg2.extras.execute_values(
+                    cursor,
+                    "INSERT INTO deposits (refid, chat_id, firstname, lastname, amount, asset, txid, deposit_address) VALUES %s",
+                    rows,
+                    page_size=DBCONF.BULK_PAGE_SIZE
+                )
+            return len(rows)
         except Exception as e:
-            logging.error(f"Error adding deposit record with refid {p_refid}: {e}")
+            logging.error(f"Error adding {len(rows)} deposit records: {e}")
             return  None
-    
 
+
+    @db_call
     def check_if_deposit_processed(self, p_refid):
         """
         Checks if a deposit with the given reference ID has been processed.
@@ -183,17 +643,33 @@ class DataHandler:
         Raises:
             Exception: If there is an error while checking the deposit status.
         """
-        try:
-            # Call the 'check_if_deposit_processed' function with the provided reference ID
-            result = self.call_function('check_if_deposit_processed', p_refid)
-            
-            # Extract the boolean result from the fetched data
-            return result[0]['check_if_deposit_processed'] if result else None
-        except Exception as e:
-            logging.error(f"Error checking if deposit with refid {p_refid} is processed: {e}")
-            return  None
+        # Call the 'check_if_deposit_processed' function with the provided reference ID, it returns a single boolean
+        return self._call_function_scalar('check_if_deposit_processed', p_refid)
     
 
+    @db_call
+    def get_processed_deposits(self, p_refids):
+        """
+        Checks which of the given reference IDs belong to deposits that have been processed.
+        All reference IDs are checked with a single query.
+
+        Args:
+            p_refids (list of str): Reference IDs of the deposits to check.
+
+        Returns:
+            set or None: The reference IDs that have been processed, None if an error occurs.
+
+        Raises:
+            Exception: If there is an error while checking the deposit status.
+        """
+        if not p_refids:
+            return set()
+        # Call the 'get_processed_deposits' function with all reference IDs at once
+        result = self.call_function('get_processed_deposits', list(p_refids))
+        return {row['refid'] for row in result} if result is not None else None
+
+
+    @db_call
     def compound_returns(self, p_current_date):
         """
         Executes the 'compound_returns' procedure to compound returns for all balances.
@@ -207,12 +683,8 @@ class DataHandler:
         Raises:
             Exception: If there is an error while compounding returns.
         """
-        try:
-            # Call the 'compound_returns' procedure with the provided current date
-            return self.call_procedure("compound_returns", p_current_date)
-        except Exception as e:
-            logging.error(f"Error compounding returns for date {p_current_date}: {e}")
-            return  None
+        # Call the 'compound_returns' procedure with the provided current date
+        return self.call_procedure("compound_returns", p_current_date)
     
 
     
@@ -220,29 +692,32 @@ class DataHandler:
         """
         Retrieves statement entries for a given chat_id and date range.
 
+        The entries are streamed from a server-side cursor, DBCONF.STATEMENT_ITERSIZE rows at a
+        time, so long date ranges aren't loaded into memory at once and the caller can start
+        working on the first entries while the rest are still being fetched. Errors are raised
+        while iterating instead of returning None, so an error can't be mistaken for an empty statement.
+
         Args:
             p_chat_id (int): Chat ID of the client for whom the statement is requested.
             p_start_date (datetime.date): Start date of the statement period.
             p_end_date (datetime.date): End date of the statement period.
 
-        Returns:
-            list or None: List of statement entries fetched from the 'statement' function,
-                        or None if no entries are found.
+        Yields:
+            dict: Statement entries from the 'statement' function, one per row.
 
         Raises:
-            Exception: If there is an error while fetching the statement entries.
+            psycopg2.Error: If there is an error while fetching the statement entries.
         """
-        try:
-            # Call the 'statement' function with the provided parameters
-            return self.call_function("statement", p_chat_id, p_start_date, p_end_date)
-        except Exception as e:
-            logging.error(f"Error fetching statement for chat_id {p_chat_id}: {e}")
-            return  None
+        # Stream the rows of the 'statement' function with the provided parameters, amounts are only displayed so floats will do
+        yield from self.call_function_iter("statement", p_chat_id, p_start_date, p_end_date, float_numerics=True)
         
 
+    @db_call
     def get_total_liabilities(self):
         """
         Retrieves total liabilities information.
+        The result is cached for CONFIG.TOTAL_LIABILITIES_CACHE_TTL seconds for all DataHandler instances,
+        so repeated admin requests don't sum up all balances each time.
 
         Returns:
             dict or None: Dictionary containing total liabilities information fetched from the 'total_liabilities' procedure,
@@ -251,14 +726,18 @@ class DataHandler:
         Raises:
             Exception: If there is an error while fetching total liabilities information.
         """
-        try:
+        with self._cache_lock:
+            total_liabilities = self._total_liabilities_cache.get('total')
+        if total_liabilities is None:
             # Call the 'total_liabilities' procedure
-            return self.call_procedure("total_liabilities")
-        except Exception as e:
-            logging.error(f"Error fetching total liabilities: {e}")
-            return  None
+            total_liabilities = self.call_procedure("total_liabilities")
+            if total_liabilities is not None:  # don't cache failed reads
+                with self._cache_lock:
+                    self._total_liabilities_cache['total'] = total_liabilities
+        return total_liabilities
     
 
+    @db_call
     def projected_balance(self, p_target_date, p_chat_id):
         """
         Calculates the projected balance for a given target date and client chat ID.
@@ -274,17 +753,15 @@ class DataHandler:
         Raises:
             Exception: If there is an error while calculating the projected balance.
         """
-        try:
-            # Call the 'projected_balance' procedure with the provided parameters
-            return self.call_procedure("projected_balance", p_target_date, p_chat_id)
-        except Exception as e:
-            logging.error(f"Error calculating projected balance: {e}")
-            return  None
+        # Call the 'projected_balance' procedure with the provided parameters
+        return self.call_procedure("projected_balance", p_target_date, p_chat_id)
     
 
+    @db_call
     def get_depositaddresses(self):
         """
         Retrieves all deposit addresses from the database.
+        The result is cached for CONFIG.DEPOSIT_ADDR_CACHE_TTL seconds for all DataHandler instances.
 
         Returns:
             list of dict or None: List of dictionaries containing deposit addresses fetched from the
@@ -293,114 +770,121 @@ class DataHandler:
         Raises:
             Exception: If there is an error while retrieving deposit addresses.
         """
-        try:
+        with self._cache_lock:
+            deposit_addresses = self._deposit_addresses_cache.get('addresses')
+        if deposit_addresses is None:
             # Call the 'get_depositaddresses' function
-            return self.call_function("get_depositaddresses")
-        except Exception as e:
-            logging.error(f"Error retrieving deposit addresses: {e}")
-            return  None
+            deposit_addresses = self.call_function("get_depositaddresses")
+            if deposit_addresses is not None:  # don't cache failed reads
+                with self._cache_lock:
+                    self._deposit_addresses_cache['addresses'] = deposit_addresses
+        return deposit_addresses
 
 
+    @db_call
     def get_deposit_address_private_key(self, deposit_address):
         """
         Retrieves the unhashed private key for a given deposit address.
+        The result is cached for CONFIG.PRIVATE_KEY_CACHE_TTL seconds for all DataHandler instances.
 
         Args:
             deposit_address (str): The deposit address to search for.
 
         Returns:
-            bytes: The unhashed private key corresponding to the deposit address.
+            str or None: The unhashed private key corresponding to the deposit address, None if an error occurs.
 
         Raises:
             Exception: If there is an error while retrieving the private key.
         """
-        try:
-            # Call the 'get_unhashed_private_key' function
-            private_key = self.call_function("get_deposit_address_private_key", deposit_address)
-            return private_key
-        except Exception as e:
-            logging.error(f"Error retrieving unhashed private key: {e}")
-            return  None
-
-
+        with self._cache_lock:
+            private_key = self._private_key_cache.get(deposit_address)
+        if private_key is None:
+            # Call the 'get_unhashed_private_key' function, it returns a single text value
+            private_key = self._call_function_scalar("get_deposit_address_private_key", deposit_address)
+            if private_key is not None:  # don't cache failed reads
+                with self._cache_lock:
+                    self._private_key_cache[deposit_address] = private_key
+        return private_key
+
+
+    @db_call
     def get_centraladdress(self):
         """
         Retrieves the central deposit address from the database.
         The central deposit address is the address where all funds found on the
         deposit addresses are transferred to.
+        The result is cached for CONFIG.CENTRAL_ADDR_CACHE_TTL seconds for all DataHandler instances.
 
         Returns:
-            dict: A dictionary containing the central deposit address and other relevant
-                details fetched from the 'get_centraladdress' function.
-                If no data is found, returns a default address from CONFIG.ETHPOLYGON.BACKUP_CENTRAL_ADDRESS.
+            list of dict: The rows of the 'get_centraladdress' function, containing the central
+                deposit address and other relevant details.
+                If no data is found, returns one row with the default address from CONFIG.ETHPOLYGON.BACKUP_CENTRAL_ADDRESS.
 
         Raises:
             Exception: If there is an error while retrieving the central address.
         """
-        try:
-            # Call the 'get_depositaddresses' function
+        with self._cache_lock:
+            central_address = self._central_address_cache.get('address')
+        if central_address is None:
+            # Call the 'get_centraladdress' function
             central_address = self.call_function("get_centraladdress")
             if central_address and len(central_address) > 0:
-                return central_address
+                with self._cache_lock:
+                    self._central_address_cache['address'] = central_address
             else:
-                return {"depositaddress": CONFIG.ETHPOLYGON.BACKUP_CENTRAL_ADDRESS}
-        except Exception as e:
-            logging.error(f"Error retrieving central address: {e}")
-            return  None
+                # same shape as the function result, callers read the first row
+                return [{"depositaddress": CONFIG.ETHPOLYGON.BACKUP_CENTRAL_ADDRESS}]
+        return central_address
+
+
+    @classmethod
+    def invalidate_address_cache(cls):
+        """
+        Clears the cached deposit addresses, central address and private keys, e.g. after the addresses were replaced.
+        """
+        with cls._cache_lock:
+            cls._deposit_addresses_cache.clear()
+            cls._central_address_cache.clear()
+            cls._private_key_cache.clear()
 
 
     def insert_depositlogs(self, logs):
         try:
-            # Prepare lists from logs
-            from_addresses = [log['from_address'] for log in logs]
-            to_addresses = [log['to_address'] for log in logs]
-            transaction_ids = [log['transaction_id'] for log in logs]
-            block_numbers = [log['block_number'] for log in logs]
+            # Prepare lists from logs, psycopg2 passes Python lists as PostgreSQL arrays.
+            # Addresses and transaction IDs are stored enclosed in single quotes, as they always have been.
+            from_addresses = [f"'{log['from_address']}'" for log in logs]
+            to_addresses = [f"'{log['to_address']}'" for log in logs]
+            transaction_ids = [f"'{log['transaction_id']}'" for log in logs]
+            # Block numbers and amounts are bound as int and Decimal, so they go into the arrays as
+            # numeric literals; a float amount is converted through str() to keep its shortest repr
+            block_numbers = [int(log['block_number']) for log in logs]
             
             # Block timestamps are already strings in the correct format
             block_timestamps = [log['block_timestamp'] for log in logs]
-            amounts = [log['amount'] for log in logs]
-            
-            # Convert lists to PostgreSQL array format
-            from_addresses_str = '{' + ','.join(f"'{addr}'" for addr in from_addresses) + '}'
-            to_addresses_str = '{' + ','.join(f"'{addr}'" for addr in to_addresses) + '}'
-            transaction_ids_str = '{' + ','.join(f"'{txid}'" for txid in transaction_ids) + '}'
-            block_numbers_str = '{' + ','.join(map(str, block_numbers)) + '}'
-            block_timestamps_str = '{' + ','.join(f"'{ts}'" for ts in block_timestamps) + '}'
-            amounts_str = '{' + ','.join(map(str, amounts)) + '}'
-
-            # Call the stored procedure with explicit type casting
-            self.call_procedure(
-                "insert_depositlogs",
-                from_addresses_str,
-                to_addresses_str,
-                transaction_ids_str,
-                block_numbers_str,
-                block_timestamps_str,
-                amounts_str,
-            )
-            self.conn.commit()
+            amounts = [log['amount'] if isinstance(log['amount'], Decimal) else Decimal(str(log['amount'])) for log in logs]
+
+            # Call the stored procedure with explicit type casting, the array parameters are bound as values
+            with self.conn.cursor() as cursor:
+                cursor.execute(
+                    "CALL insert_depositlogs(%s::text[], %s::text[], %s::text[], %s::bigint[], %s::timestamp[], %s::numeric[])",
+                    (from_addresses, to_addresses, transaction_ids, block_numbers, block_timestamps, amounts)
+                )
+            if not self._in_transaction:
+                self.conn.commit()
         except Exception as e:
             logging.error(f"Error inserting deposit logs: {e}")
-            self.conn.rollback()
+            if not self._in_transaction:
+                self.conn.rollback()
             return  None
 
 
     def get_newdepositlogs(self):
         try:
-            # Call the 'get_depositaddresses' function
+            # Call the 'get_newdepositlogs' function
+            # the function trims the single quotes around addresses and transaction IDs already
             newdeposits = self.call_function("get_newdepositlogs")
             if newdeposits and len(newdeposits) > 0:
-                result = []
-                for row in newdeposits:
-                    dict_row = dict(row)
-                    for key, value in dict_row.items():
-                        if isinstance(value, str):
-                            dict_row[key] = value.strip("'")
-                        else:
-                            dict_row[key] = value
-                    result.append(dict_row)
-                return result
+                return newdeposits
             else:
                 return None
         except Exception as e:
@@ -419,18 +903,11 @@ class DataHandler:
             Exception: If there is an error while retrieving deposit addresses.
         """
         try:
-            # create cursor
-            cursor = self.conn.cursor()
-
-            # execute sql query
-            cursor.execute("SELECT * FROM depositlogs_view ORDER BY block_timestamp DESC LIMIT 300")
-
-            # fetch results
-            deposits = cursor.fetchall()
-
-            # convert to list of dictionaries
-            columns = [desc[0] for desc in cursor.description]
-            deposits_list = [dict(zip(columns, row)) for row in deposits]
+            # the RealDictCursor returns the rows as dictionaries already
+            with self._cursor_lock:
+                cursor = self.dict_cursor()
+                cursor.execute("SELECT * FROM depositlogs_view ORDER BY block_timestamp DESC LIMIT 300")
+                deposits_list = cursor.fetchall()
 
             return deposits_list
         except Exception as e:
@@ -438,6 +915,7 @@ class DataHandler:
             return  None
 
 
+    @db_call
     def update_depositlogs_refund(self, p_transaction_id, p_refund_transaction_id):
         """
         Retrieves all unidentified depositsfrom the database.
@@ -448,19 +926,15 @@ class DataHandler:
         Raises:
             Exception: If there is an error while retrieving deposit addresses.
         """
-        try:
-            # Call the 'get_depositaddresses' function
-            self.call_function("update_depositlogs_refund", p_transaction_id, p_refund_transaction_id)
-        except Exception as e:
-            logging.error(f"Error updating depositlog with refund data: {e}")
-            return  None
+        # Call the 'get_depositaddresses' function
+        self.call_function("update_depositlogs_refund", p_transaction_id, p_refund_transaction_id)
 
 
     def get_profits_one_day(self, p_chat_id):
         url = f"{CONFIG.RETURNS_BASEURL}/get_profits_one_day"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         try:
-            response = requests.post(url, params={
+            response = self.http_session().post(url, params={
                 'chat_id': p_chat_id
             })
             response.raise_for_status()
@@ -472,9 +946,9 @@ class DataHandler:
 
     def get_profits_one_week(self, p_chat_id):
         url = f"{CONFIG.RETURNS_BASEURL}/get_profits_one_week"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         try:
-            response = requests.post(url, params={
+            response = self.http_session().post(url, params={
                 'chat_id': p_chat_id
             })
             response.raise_for_status()
@@ -486,9 +960,9 @@ class DataHandler:
         
     def get_profits_one_month(self, p_chat_id):
         url = f"{CONFIG.RETURNS_BASEURL}/get_profits_one_month"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         try:
-            response = requests.post(url, params={
+            response = self.http_session().post(url, params={
                 'chat_id': p_chat_id
             })
             response.raise_for_status()
@@ -500,9 +974,9 @@ class DataHandler:
 
     def get_profits_three_months(self, p_chat_id):
         url = f"{CONFIG.RETURNS_BASEURL}/get_profits_three_months"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         try:
-            response = requests.post(url, params={
+            response = self.http_session().post(url, params={
                 'chat_id': p_chat_id
             })
             response.raise_for_status()
@@ -514,9 +988,9 @@ class DataHandler:
 
     def get_profits_all_time(self, p_chat_id):
         url = f"{CONFIG.RETURNS_BASEURL}/get_profits_all_time"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         try:
-            response = requests.post(url, params={
+            response = self.http_session().post(url, params={
                 'chat_id': p_chat_id
             })
             response.raise_for_status()
@@ -528,9 +1002,9 @@ class DataHandler:
 
     def get_bot_returns_yesterday(self):
         url = f"{CONFIG.RETURNS_BASEURL}/get_bot_returns_yesterday"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         try:
-            response = requests.post(url)
+            response = self.http_session().post(url)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -540,9 +1014,9 @@ class DataHandler:
 
     def calculate_weekly_compounded_return(self):
         url = f"{CONFIG.RETURNS_BASEURL}/calculate_weekly_compounded_return"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         try:
-            response = requests.post(url)
+            response = self.http_session().post(url)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -552,9 +1026,9 @@ class DataHandler:
 
     def calculate_monthly_compounded_return(self):
         url = f"{CONFIG.RETURNS_BASEURL}/calculate_monthly_compounded_return"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         try:
-            response = requests.post(url)
+            response = self.http_session().post(url)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -564,9 +1038,9 @@ class DataHandler:
 
     def calculate_three_months_compounded_return(self):
         url = f"{CONFIG.RETURNS_BASEURL}/calculate_three_months_compounded_return"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         try:
-            response = requests.post(url)
+            response = self.http_session().post(url)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -576,18 +1050,18 @@ class DataHandler:
 
     def get_total_deposits_client(self, p_chat_id: int):
         url = f"{CONFIG.RETURNS_BASEURL}/get_total_deposits_client"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         
         try:
             # Make a POST request with the chat_id as a parameter
-            response = requests.get(url, params={"chat_id": p_chat_id})
+            response = self.http_session().get(url, params={"chat_id": p_chat_id})
             response.raise_for_status()  # Check if the request was successful
             
-            # Parse the response as JSON
-            data = response.json()
+            # Parse the response as JSON, reading the amount as Decimal so it keeps its exact value
+            data = json.loads(response.content, parse_float=Decimal)
             
-            # Assuming the API returns a JSON object with the total deposit as a float
-            client_total_deposit = float(data)  # Ensure it's a float
+            # The API returns the total deposit as a JSON number
+            client_total_deposit = Decimal(data)
             
             return client_total_deposit
         
@@ -607,11 +1081,11 @@ class DataHandler:
 
     def set_client_username(self, p_chat_id: int, p_username: str):
         url = f"{CONFIG.RETURNS_BASEURL}/set_client_username"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         
         try:
             # Make a POST request with the chat_id as a parameter
-            response = requests.get(url, params={"chat_id": p_chat_id, "username": p_username})
+            response = self.http_session().get(url, params={"chat_id": p_chat_id, "username": p_username})
             response.raise_for_status()  # Check if the request was successful
             
             # Parse the response as JSON
@@ -642,11 +1116,11 @@ class DataHandler:
             int: The chat_id if the referral exists, or None if it doesn't or an error occurs.
         """
         url = f"{CONFIG.RETURNS_BASEURL}/validate_referral"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         
         try:
             # Make a GET request to the referral validation endpoint
-            response = requests.get(url, params={"referral": p_referral})
+            response = self.http_session().get(url, params={"referral": p_referral})
             response.raise_for_status()  # Raise an exception if the request was unsuccessful
             
             # Parse the response as JSON and return the result (chat_id or None)
@@ -679,11 +1153,11 @@ class DataHandler:
             str: A success message if the bonus is successfully added, or None if an error occurs.
         """
         url = f"{CONFIG.RETURNS_BASEURL}/handle_referral_bonus"
-        print(f"URL: {url}")
+        logging.debug("URL: %s", url)
         
         try:
             # Make a POST request to the referral bonus endpoint
-            response = requests.post(url, params={"chat_id": p_chat_id, "bonus_amount": p_bonus_amount})
+            response = self.http_session().post(url, params={"chat_id": p_chat_id, "bonus_amount": p_bonus_amount})
             response.raise_for_status()  # Raise an exception if the request was unsuccessful
             
             # Parse the response as JSON and return the success message
@@ -715,17 +1189,17 @@ class DataHandler:
             float: The multiplier if the bonus code is valid, or None if it doesn't or an error occurs.
         """
         url = f"{CONFIG.RETURNS_BASEURL}/validate_bonuscode"
-        print(f"URL: {url}")
-        print(f"bonuscode to be sent: {bonuscode}")
+        logging.debug("URL: %s", url)
+        logging.debug("bonuscode to be sent: %s", bonuscode)
         
         try:
             # Make a POST request to the bonus code validation endpoint
-            response = requests.post(url, json={"bonus_code": bonuscode})
+            response = self.http_session().post(url, json={"bonus_code": bonuscode})
             response.raise_for_status()  # Raise an exception if the request was unsuccessful
             
             # Parse the response as JSON and retrieve the multiplier
             multiplier = response.json().get("multiplier")
-            print(f"Response received in multiplier: {multiplier}")
+            logging.debug("Response received in multiplier: %s", multiplier)
             return multiplier  # Return the multiplier or None
             
         except requests.exceptions.HTTPError as http_err:
@@ -737,6 +1211,7 @@ class DataHandler:
                 return None
 
 
+    @db_call
     def update_transferred_status_true(self, transaction_id):
         """
         Updates the 'transferred' boolean field in depositlogs to TRUE by transaction_id (varchar).
@@ -747,14 +1222,11 @@ class DataHandler:
         Raises:
             Exception: If there is an error while retrieving deposit addresses.
         """
-        try:
-            # Call the 'get_depositaddresses' function
-            return self.call_function("update_transferred_status_true", transaction_id)
-        except Exception as e:
-            logging.error(f"Error updating depositlogs, 'transferred' to TRUE (tx_hash = {transaction_id}): {e}")
-            return  None
+        # Call the 'get_depositaddresses' function
+        return self.call_function("update_transferred_status_true", transaction_id)
 
 
+    @db_call
     def update_transferred_status_false(self, transaction_id):
         """
         Updates the 'transferred' boolean field in depositlogs to FALSE by transaction_id (varchar).
@@ -765,12 +1237,8 @@ class DataHandler:
         Raises:
             Exception: If there is an error while retrieving deposit addresses.
         """
-        try:
-            # Call the 'get_depositaddresses' function
-            return self.call_function("update_transferred_status_false", transaction_id)
-        except Exception as e:
-            logging.error(f"Error updating depositlogs, 'transferred' to FALSE (tx_hash = {transaction_id}): {e}")
-            return  None
+        # Call the 'get_depositaddresses' function
+        return self.call_function("update_transferred_status_false", transaction_id)
 
 
     def send_deposit_notification(self, username: str, deposit_amount: float):
@@ -785,12 +1253,12 @@ class DataHandler:
             dict: A response message if the notification was sent successfully, or None if an error occurs.
         """
         url = f"{CONFIG.RETURNS_BASEURL}/send_deposit_notification"
-        logging.info(f"URL: {url}")
+        logging.debug("URL: %s", url)
         logging.info(f"Sending deposit notification for username: {username} with amount: {deposit_amount}")
         
         try:
             # Make a GET request to the deposit notification endpoint
-            response = requests.get(url, params={"username": username, "deposit_amount": deposit_amount})
+            response = self.http_session().get(url, params={"username": username, "deposit_amount": deposit_amount})
             response.raise_for_status()  # Raise an exception if the request was unsuccessful
             
             # Parse the response as JSON
@@ -808,17 +1276,25 @@ class DataHandler:
 
     def close(self):
         """
-        Closes the database connection.
+        Returns the database connection to the connection pool, if one was borrowed.
+        Calling close() more than once is harmless, the connection is only returned once.
 
-        Logs an info message when the database connection is successfully closed.
+        Logs an info message when the database connection is successfully returned.
 
         Raises:
-            Exception: If there is an error while closing the database connection.
+            Exception: If there is an error while returning the database connection.
         """
         try:
-            if self.conn:
-                self.conn.close()
-                logging.info("Database connection closed")
+            with self._cursor_lock:
+                conn, self._conn = self._conn, None
+                if conn is not None:
+                    if self._cursor is not None and not self._cursor.closed:
+                        self._cursor.close()
+                    self._cursor = None
+                    # a connection left in a failed or open transaction is discarded instead of reused
+                    discard = conn.closed or conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+                    self.get_pool().putconn(conn, close=discard)
+                    logging.info("Database connection returned to pool")
         except Exception as e:
             logging.error(f"Error closing database connection: {e}")
             return  None
@@ -834,7 +1310,7 @@ This script is designed to import data from a CSV file containing returns into a
 
 It utilizes argparse to handle command-line arguments, allowing customization of the CSV file name to be imported.
 Upon execution, the script initializes a DataHandler instance connected to the database configured in the CONFIG module.
-The import_csv_data method of DataHandler is then called with the specified or default CSV file name.
+The import_csv_data_copy method of DataHandler is then called with the specified or default CSV file name.
 
 Command-line Arguments:
     --file_name (str): Optional. Specifies the name of the CSV file containing returns data. Defaults to 'returns.csv'.
@@ -847,10 +1323,12 @@ Execution Flow:
    - Establishes a connection to the database using credentials and configuration from the CONFIG module.
 
 3. Data Import:
-   - Invokes the import_csv_data method of the DataHandler instance to import data from the specified CSV file into the database.
+   - Invokes the import_csv_data_copy method of the DataHandler instance to stream the specified CSV file into the database.
+   - The import runs inside data.transaction(), so any row-level import added here is committed at once instead of row by row.
 
 Error Handling:
 - Exceptions encountered during execution are logged using Python's logging module, providing detailed error messages for debugging purposes.
+- A failed import is rolled back as a whole and the script exits with status 1.
 
 Note:
 - Ensure that the CONFIG module contains accurate database connection details (DBNAME, USER, PASSWORD, HOST, PORT) for successful execution.
@@ -872,13 +1350,16 @@ if __name__ == "__main__":
         # Parse command-line arguments
         args = parser.parse_args()
 
-        # Initialize DataHandler instance
-        data = DataHandler()
-
-        # Call import_csv_data method with the provided file name
-        data.import_csv_data(args.file_name)
+        # Initialize DataHandler instance and call import_csv_data_copy method with the provided file name
+        # the import runs in a single transaction, a failed import is rolled back as a whole
+        with DataHandler() as data, data.transaction():
+            imported_rows = data.import_csv_data_copy(args.file_name)
+            if imported_rows is None:
+                raise RuntimeError(f"import of {args.file_name} failed, nothing was imported")
+        logging.info(f"Imported {imported_rows} rows from {args.file_name}")
 
     except Exception as e:
         # Log any errors that occur during execution
         import logging
         logging.error(f"Error in main execution: {e}")
+        raise SystemExit(1)
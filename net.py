@@ -0,0 +1,52 @@
+# net.py
+import aiohttp
+import logging
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClient:
+    """
+    Holds the aiohttp session shared by all outgoing HTTP requests of the bot, so
+    keep-alive connections to the Returns server app and the integration endpoints
+    are reused instead of opening a new connection pool per request.
+
+    The session is created lazily on first use, because an aiohttp session must be
+    created from within the running event loop it is used in.
+
+    Methods:
+        session(): Returns the shared session, creating it if necessary.
+        close(): Closes the shared session.
+    """
+    _session: aiohttp.ClientSession = None
+
+    @classmethod
+    def session(cls) -> aiohttp.ClientSession:
+        """
+        Returns the shared aiohttp session, creating it if it doesn't exist or was closed.
+
+        Returns:
+            aiohttp.ClientSession: The shared session.
+        """
+        if cls._session is None or cls._session.closed:
+            cls._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=CONFIG.HTTP.MAX_CONNECTIONS_PER_HOST),
+                timeout=aiohttp.ClientTimeout(total=CONFIG.HTTP.TIMEOUT)
+            )
+            logger.info("HTTP client session created")
+        return cls._session
+
+    @classmethod
+    async def close(cls) -> None:
+        """
+        Closes the shared aiohttp session if it is open.
+        """
+        try:
+            if cls._session is not None and not cls._session.closed:
+                await cls._session.close()
+                logger.info("HTTP client session closed")
+        except Exception as e:
+            logger.error(f"Error closing HTTP client session: {e}")
+        finally:
+            cls._session = None
@@ -9,32 +9,30 @@ with some internal qeueue feature.
 from telegram.ext import Application
 from config import CONFIG
 import asyncio
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 class AlgoEagleTelegramBot(Application):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # self.shutdown_event = asyncio.Event()  # Create the shutdown event
+        self.shutdown_event = asyncio.Event()  # Create the shutdown event
 
     async def stop(self):
         self.shutdown_event.set()  # Set the shutdown event
-        print("CUSTOM STOP METHOD IN AlgoEagleTelegramBot")
+        logger.info("Stopping the Telegram application")
         await super().stop()
 
-    @classmethod
-    def custom_builder(cls):
-        # buld an Application instance first
-        app = cls.builder().token(CONFIG.TELEGRAM_KEY).build()
-        
-        # convert the base class instance (Application) into a subclass instance (AlgoEagleTelegramBot)
-        app.__class__ = cls # change the instance's class to AlgoEagleTelegramBot
-
-        # manually set property defined in the subclass, in this case shutdown_event
-        app.shutdown_event = asyncio.Event()
-        return app
-   
-
-# Initialize the Telegram bot application instance
-application = AlgoEagleTelegramBot.custom_builder()
 
-print(f"SELF.SHUTDOWN_EVENT = {application.shutdown_event.is_set()}")
\ No newline at end of file
+# Initialize the Telegram bot application instance, the one instance shared by main.py and fastapi_app.py
+# the builder creates the AlgoEagleTelegramBot itself, so its __init__ runs like for any Application
+# updates are processed concurrently (up to CONFIG.CONCURRENT_UPDATES at a time) instead of one after another
+application = (
+    Application.builder()
+    .token(CONFIG.TELEGRAM_KEY)
+    .application_class(AlgoEagleTelegramBot)
+    .concurrent_updates(CONFIG.CONCURRENT_UPDATES)
+    .build()
+)
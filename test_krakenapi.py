@@ -1,58 +1,87 @@
 # krakenapi.py
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
+import threading
 import hashlib
 import hmac
 import base64
 import urllib.parse
+import logging
 from config import CONFIG
 
+logger = logging.getLogger(__name__)
+
 class KrakenAPI:
     BASE_URL = CONFIG.API.BASE_URL
 
     def __init__(self, api_key, private_key):
         self.api_key = api_key
         self.private_key = private_key
-
-    def create_auth_headers(self, uri_path, post_data):
-        nonce = str(int(time.time() * 1000))  # Current timestamp in milliseconds
+        self._encoded_uri_paths = {}  # endpoint path -> UTF-8 encoded endpoint path, used for signing
+        self._secret = base64.b64decode(private_key)  # decoded once, the signing key of every request
+        self._headers = {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Accept': 'application/json',
+            'API-Key': api_key
+        }
+        self._last_nonce = 0
+        self._nonce_lock = threading.Lock()
+
+        # keep-alive session, the TLS connection to the Kraken API is reused across calls
+        # idempotent requests only are retried, the signed POSTs aren't
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        ))
+
+    def sign_request(self, uri_path, post_data):
+        # Current timestamp in milliseconds, taken as int from time_ns(); bumped past the previous
+        # nonce so two calls within the same millisecond still send increasing nonces
+        with self._nonce_lock:
+            self._last_nonce = max(self._last_nonce + 1, time.time_ns() // 1_000_000)
+            nonce = str(self._last_nonce)
         post_data['nonce'] = nonce
 
         # URL encode the POST data
         url_encoded_post_data = urllib.parse.urlencode(post_data)
 
-        # Create the message to sign
-        message = (nonce + url_encoded_post_data).encode()
-        encoded_uri_path = uri_path.encode()
+        # Create the message to sign, joined in one allocation instead of concatenated
+        message = b''.join((nonce.encode(), url_encoded_post_data.encode()))
+        encoded_uri_path = self._encoded_uri_paths.get(uri_path)
+        if encoded_uri_path is None:
+            encoded_uri_path = self._encoded_uri_paths[uri_path] = uri_path.encode()
 
-        # Create the signature
-        secret_decoded = base64.b64decode(self.private_key)
-        hmac_digest = hmac.new(secret_decoded, encoded_uri_path + hashlib.sha256(message).digest(), hashlib.sha512)
-        signature = base64.b64encode(hmac_digest.digest()).decode()
+        # Create the signature, hmac.digest() is the one-shot OpenSSL implementation of hmac.new(...).digest()
+        hmac_digest = hmac.digest(self._secret, b''.join((encoded_uri_path, hashlib.sha256(message).digest())), 'sha512')
+        signature = base64.b64encode(hmac_digest).decode()
 
-        # Create headers
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Accept': 'application/json',
-            'API-Key': self.api_key,
-            'API-Sign': signature
-        }
+        # Create headers, only the signature differs between requests
+        headers = {**self._headers, 'API-Sign': signature}
 
-        return headers
+        return headers, url_encoded_post_data
+
+    def create_auth_headers(self, uri_path, post_data):
+        return self.sign_request(uri_path, post_data)[0]
 
     def call_api(self, endpoint_path, post_data):
         url = self.BASE_URL + endpoint_path
-        headers = self.create_auth_headers(endpoint_path, post_data)
+        # the body is posted as the string that was signed, requests doesn't encode post_data a second time
+        headers, body = self.sign_request(endpoint_path, post_data)
 
         try:
-            response = requests.post(url, headers=headers, data=post_data)
+            response = self._session.post(url, headers=headers, data=body,
+                                          timeout=(CONFIG.API.CONNECT_TIMEOUT, CONFIG.API.READ_TIMEOUT))
             response.raise_for_status()  # Raise an exception for HTTP errors
             return response.json()  # Parse JSON response
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching data: {e}")
+            logger.error("Error fetching data from Kraken API: %s", e)
             return None
         except ValueError as e:
-            print(f"Error parsing JSON: {e}")
+            logger.error("Error parsing JSON response from Kraken API: %s", e)
             return None
 
     def generate_new_deposit_address(self, asset, method, new=False):
@@ -82,6 +111,7 @@ class KrakenAPI:
 
 # Example usage
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
     kraken = KrakenAPI(CONFIG.SPOT_API_KEY, CONFIG.SPOT_PRIVATE_KEY)
 
     asset = 'USDT'
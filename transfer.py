@@ -1,7 +1,13 @@
-import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from web3 import Web3
-from web3.exceptions import ContractLogicError, TransactionNotFound
+from web3.exceptions import ContractLogicError, TransactionNotFound, TimeExhausted
 from eth_account import Account
 from config import CONFIG
 from model import DataHandler
@@ -14,6 +20,82 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ABI of the USDT contract, only the transfer function is used; a tuple, it is shared by all contract objects
+USDT_TRANSFER_ABI = (
+    {
+        "constant": False,
+        "inputs": [
+            {
+                "name": "_to",
+                "type": "address"
+            },
+            {
+                "name": "_value",
+                "type": "uint256"
+            }
+        ],
+        "name": "transfer",
+        "outputs": [
+            {
+                "name": "",
+                "type": "bool"
+            }
+        ],
+        "payable": False,
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
+)
+
+
+@lru_cache(maxsize=4)
+def usdt_contract(web3, address):
+    """
+    Returns the USDT contract at address for the given Web3 instance, built once per
+    (web3, address) so its function selectors are computed only once.
+
+    Args:
+        web3 (Web3): The Web3 instance the contract is bound to.
+        address (str): The address of the USDT contract.
+
+    Returns:
+        Contract: The USDT contract.
+    """
+    return web3.eth.contract(address=address, abi=USDT_TRANSFER_ABI)
+
+
+# node error message of a nonce that was already used, the nonce has to be read from the chain again
+NONCE_TOO_LOW_ERROR = 'nonce too low'
+# node error message of a transaction the node already has, e.g. when the response to the first send was lost;
+# the transaction is pending, so it counts as sent and its nonce as used
+ALREADY_KNOWN_ERROR = 'already known'
+
+# runs the gas price, nonce and gas estimate RPCs of a transfer concurrently, shared by all transfers
+# instead of starting new threads per transfer; up to 3 RPCs for each concurrent transfer
+rpc_executor = ThreadPoolExecutor(max_workers=3 * CONFIG.ETHPOLYGON.TRANSFER_CONCURRENCY, thread_name_prefix='transfer_rpc')
+
+# address -> next nonce to use, read from the chain once and then counted up locally;
+# shared by all USDT instances, so they never hand out the same nonce of an address twice
+nonce_cache = {}
+# address -> lock of its nonce, transfers from different addresses don't wait for each other
+nonce_locks = {}
+nonce_locks_lock = threading.Lock()
+
+
+def nonce_lock(address):
+    """
+    Returns the lock guarding the cached nonce of address, creating it on first use.
+
+    Args:
+        address (str): The sending address.
+
+    Returns:
+        threading.Lock: The lock of address.
+    """
+    with nonce_locks_lock:
+        return nonce_locks.setdefault(address, threading.Lock())
+
+
 class Funds:
     """
     The `Funds` class provides functionality for managing and transferring USDT (Tether) tokens on the Polygon network. 
@@ -38,13 +120,20 @@ class Funds:
             polygon_url (str): The URL of the Polygon network RPC endpoint.
             web3 (Web3): An instance of the Web3 class used to interact with the Ethereum blockchain.
             database (DataHandler): An instance of the DataHandler class used for database operations.
+            usdt_contract (Contract): The USDT contract on the Polygon network.
         
         Methods:
+            shared_web3(polygon_url): Returns the Web3 instance shared by all USDT instances, with a keep-alive session.
+
             __init__(): Initializes the USDT class, sets up the Web3 connection, and configures the database handler.
             
             get_gas_price(): Fetches the current gas price from the Ethereum network and adjusts it based on a configured percentage increase.
             
-            estimate_gas(from_address, to_address, amount, usdt_contract): Estimates the gas required for a USDT transfer transaction.
+            estimate_gas(from_address, transfer_function): Estimates the gas required for a USDT transfer transaction.
+
+            next_nonce(address): Returns the nonce for the next transaction from address, counted up locally after the first read from the chain.
+
+            send_transfer(transfer_function, gas, gas_price, nonce, private_key): Signs a transfer transaction and sends it to the network.
             
             transfer(from_address, amount, deposit_tx_id): Executes a USDT transfer from the specified deposit account to the central collection account. 
             The method handles transaction signing, submission to the blockchain, and receipt verification.
@@ -54,11 +143,80 @@ class Funds:
             funds.transfer("0xYourDepositAddress", 100, "deposit_transaction_id")
         """
 
+        _web3: Web3 = None
+        _web3_lock = threading.Lock()
+
+        @classmethod
+        def shared_web3(cls, polygon_url) -> Web3:
+            """
+            Returns the Web3 instance shared by all USDT instances, creating it on first use. Its
+            HTTPProvider uses a keep-alive requests session, so the JSON-RPC calls of every transfer
+            sweep reuse the TLS connections to the RPC endpoint, and the USDT contract is built only once.
+
+            Args:
+                polygon_url (str): The URL of the Polygon network RPC endpoint.
+
+            Returns:
+                Web3: The shared Web3 instance.
+            """
+            if cls._web3 is None:
+                with cls._web3_lock:
+                    if cls._web3 is None:
+                        session = requests.Session()
+                        session.mount('https://', HTTPAdapter(
+                            pool_connections=2,
+                            pool_maxsize=16,  # TRANSFER_CONCURRENCY transfers with up to 3 concurrent RPCs each
+                            # JSON-RPC calls are POSTs, only failed connects and rate limited (429) requests are retried,
+                            # they weren't processed; after a read error or a 5xx on eth_sendRawTransaction it is open
+                            # whether the transaction was sent, so those are never re-POSTed
+                            max_retries=Retry(total=3, read=0, other=0, backoff_factor=0.3, status_forcelist=[429], allowed_methods=None)
+                        ))
+                        cls._web3 = Web3(Web3.HTTPProvider(
+                            polygon_url,
+                            session=session,
+                            request_kwargs={'timeout': CONFIG.HTTP.TIMEOUT}
+                        ))
+            return cls._web3
+
         def __init__(self) -> None:
             # Configure your Web3 provider (Infura or Alchemy)
             self.polygon_url = CONFIG.API.INFURA_API_URL + CONFIG.API.INFURA_API_KEY
-            self.web3 = Web3(Web3.HTTPProvider(self.polygon_url))
+            self.web3 = self.shared_web3(self.polygon_url)
             self.database = DataHandler()
+            # USDT contract on Polygon, built once instead of on every transfer
+            self.usdt_contract = usdt_contract(self.web3, CONFIG.ETHPOLYGON.USDT_CONTRACT)
+
+        # Function to get the nonce for the next transaction sent from address
+        def next_nonce(self, address):
+            with nonce_lock(address):
+                nonce = nonce_cache.get(address)
+                if nonce is None:
+                    nonce = self.web3.eth.get_transaction_count(address, 'pending')
+                nonce_cache[address] = nonce + 1
+                return nonce
+
+        # Function to forget the local nonce of address, the next one is read from the chain again
+        def reset_nonce(self, address):
+            with nonce_lock(address):
+                nonce_cache.pop(address, None)
+
+        # Function to sign a transfer transaction and send it to the Polygon network
+        def send_transfer(self, transfer_function, gas, gas_price, nonce, private_key):
+            transaction = transfer_function.build_transaction({
+                'chainId': CONFIG.ETHPOLYGON.CHAIN_ID,
+                'gas': gas,  # Use the estimated gas
+                'gasPrice': gas_price,  # Use fetched gas price
+                'nonce': nonce,
+            })
+            # Sign the transaction with the private key
+            signed_transaction = self.web3.eth.account.sign_transaction(transaction, private_key)
+            try:
+                return self.web3.eth.send_raw_transaction(signed_transaction.rawTransaction)
+            except ValueError as e:
+                if ALREADY_KNOWN_ERROR not in str(e).lower():
+                    raise
+                logger.warning(f"Transaction {signed_transaction.hash.hex()} is already known to the node, treating it as sent")
+                return signed_transaction.hash
 
         # Function to get current gas price
         def get_gas_price(self):
@@ -66,105 +224,88 @@ class Funds:
             return current_gas_price
 
         # Function to estimate gas for the transaction
-        def estimate_gas(self, from_address, to_address, amount, usdt_contract):
-            transaction = usdt_contract.functions.transfer(to_address, int(amount)).build_transaction({
-                'chainId': 137,  # polygon mainnet chain id
-                'gas': 69005,    # This is a placeholder and will be overridden by the estimate
-                'gasPrice': self.get_gas_price(),
-                'nonce': self.web3.eth.get_transaction_count(from_address),
-                'from': from_address,
-            })
-            return self.web3.eth.estimate_gas(transaction)
+        # the estimate doesn't depend on gas price or nonce, only the call and its sender are needed
+        def estimate_gas(self, from_address, transfer_function):
+            return transfer_function.estimate_gas({'from': from_address})
 
 
         def transfer(self, from_address, amount, deposit_tx_id):
             t_amount = int(amount * (10 ** 6))  # 0.1 USDT in Wei
 
-            # Fetch the private key
-            priv_key = self.database.get_deposit_address_private_key(from_address)[0]
-            private_key = priv_key['get_deposit_address_private_key']
+            # Fetch the private key, cached by DataHandler
+            private_key = self.database.get_deposit_address_private_key(from_address)
+            if private_key is None:
+                logger.error(f"No private key retrieved for deposit address {from_address}")
+                return f"No private key retrieved for deposit address {from_address}"
             
             #account = Account.from_key(private_key)
 
-            # get wallet address where the funds need to be sent to from database
+            # get wallet address where the funds need to be sent to from database, cached by DataHandler
             raw_to_address = self.database.get_centraladdress()[0]
             to_address = raw_to_address['depositaddress']
 
-            # USDT contract address on Polygon
-            usdt_address = CONFIG.ETHPOLYGON.USDT_CONTRACT
-            usdt_contract = self.web3.eth.contract(address=usdt_address, abi=[
-                {
-                    "constant": False,
-                    "inputs": [
-                        {
-                            "name": "_to",
-                            "type": "address"
-                        },
-                        {
-                            "name": "_value",
-                            "type": "uint256"
-                        }
-                    ],
-                    "name": "transfer",
-                    "outputs": [
-                        {
-                            "name": "",
-                            "type": "bool"
-                        }
-                    ],
-                    "payable": False,
-                    "stateMutability": "nonpayable",
-                    "type": "function"
-                }
-            ])
-
-
-            # Get the current gas price
-            current_gas_price = self.get_gas_price()
-            logger.info(f'Current gas price: {self.web3.from_wei(current_gas_price, "gwei")} Gwei')
+            # the transfer call of the USDT contract, used for the gas estimate and the transaction
+            transfer_function = self.usdt_contract.functions.transfer(to_address, t_amount)
 
-            # Estimate gas for the transaction
-            estimated_gas = self.estimate_gas(from_address, to_address, t_amount, usdt_contract)
+            # Get the current gas price, the nonce and the gas estimate, once per transfer,
+            # they are independent RPCs so fetch them concurrently
+            gas_price_future = rpc_executor.submit(self.get_gas_price)
+            nonce_future = rpc_executor.submit(self.next_nonce, from_address)
+            estimated_gas_future = rpc_executor.submit(self.estimate_gas, from_address, transfer_function)
+            try:
+                current_gas_price = gas_price_future.result()
+                nonce = nonce_future.result()
+                estimated_gas = estimated_gas_future.result()
+            except Exception:
+                # no transaction is sent, the counted-up nonce would leave a gap;
+                # wait until the nonce is counted up before it is read from the chain again
+                wait([gas_price_future, nonce_future, estimated_gas_future])
+                self.reset_nonce(from_address)
+                raise
+            logger.info(f'Current gas price: {self.web3.from_wei(current_gas_price, "gwei")} Gwei')
             logger.info(f'Estimated gas: {estimated_gas}')
 
-            # Create a transaction dictionary
-            transaction = usdt_contract.functions.transfer(to_address, t_amount).build_transaction({
-                'chainId': 137,  # polygon mainnet chain id
-                'gas': estimated_gas,  # Use the estimated gas
-                'gasPrice': current_gas_price,  # Use fetched gas price
-                'nonce': self.web3.eth.get_transaction_count(from_address),
-            })
-
-            # Sign the transaction with the private key
-            signed_transaction = self.web3.eth.account.sign_transaction(transaction, private_key)
-
             # Send the transaction to the Polygon network
             try:
-                tx_hash = self.web3.eth.send_raw_transaction(signed_transaction.rawTransaction)
+                try:
+                    tx_hash = self.send_transfer(transfer_function, estimated_gas, current_gas_price, nonce, private_key)
+                except ValueError as e:
+                    # the local nonce is behind the chain (e.g. a transaction sent from elsewhere), re-read it and retry once
+                    if NONCE_TOO_LOW_ERROR not in str(e).lower():
+                        raise
+                    logger.warning(f"Nonce {nonce} of {from_address} rejected ({e}), retrying with the nonce from the chain")
+                    self.reset_nonce(from_address)
+                    nonce = self.next_nonce(from_address)
+                    tx_hash = self.send_transfer(transfer_function, estimated_gas, current_gas_price, nonce, private_key)
             except (ContractLogicError, ValueError, TransactionNotFound, Exception) as e:
+                # the nonce may not have been used, read it from the chain for the next transfer
+                self.reset_nonce(from_address)
                 logger.error(f"Web3 Eth transaction error: {e}")
                 return f"Web3 Eth transaction error: {e}"            
             tx_hash_str = tx_hash.hex()
             logger.info(f"Updating record with deposit transaction id {deposit_tx_id} to TRUE")
             self.database.update_transferred_status_true(f"'{deposit_tx_id}'")                
             logger.info(f'Transfer successfully initiated: {tx_hash_str}')
+            # transient RPC or connection errors while waiting don't end the wait, only the timeout does;
+            # without a receipt the transaction may still be mined, the record stays marked as transferred
+            deadline = time.monotonic() + CONFIG.ETHPOLYGON.RECEIPT_TIMEOUT
             receipt = None
-            max_retries = 30
-            retry_count = 0
-            while receipt is None and retry_count  < max_retries:
+            while receipt is None:
                 try:
-                    receipt = self.web3.eth.get_transaction_receipt(tx_hash)
-                    if receipt is not None:
-                        break
-                    else:
-                        logger.info('Transaction not yet mined, waiting...')
-                        time.sleep(10)
-                except TransactionNotFound as e:
-                    logger.warning(f"Waiting for receiving transaction receipt {tx_hash_str}: {e}")
-                    time.sleep(10)
+                    receipt = self.web3.eth.wait_for_transaction_receipt(
+                        tx_hash,
+                        timeout=max(deadline - time.monotonic(), CONFIG.ETHPOLYGON.RECEIPT_POLL_LATENCY),
+                        poll_latency=CONFIG.ETHPOLYGON.RECEIPT_POLL_LATENCY
+                    )
+                except TimeExhausted as e:
+                    logger.error(f"No receipt for transaction {tx_hash_str} within {CONFIG.ETHPOLYGON.RECEIPT_TIMEOUT} seconds: {e}")
+                    return f"No receipt for transaction {tx_hash_str}"
                 except Exception as e:
-                    logger.warning(f"Error while fetching transaction receipt of with TxHash {tx_hash_str}: {e}")
-                    time.sleep(10)
+                    if time.monotonic() >= deadline:
+                        logger.error(f"No receipt for transaction {tx_hash_str} within {CONFIG.ETHPOLYGON.RECEIPT_TIMEOUT} seconds, last error: {e}")
+                        return f"No receipt for transaction {tx_hash_str}"
+                    logger.warning(f"Error while waiting for the receipt of transaction {tx_hash_str}, still waiting: {e}")
+                    time.sleep(CONFIG.ETHPOLYGON.RECEIPT_POLL_LATENCY)
 
             if receipt.status == 1:
                 logger.info(f'\n\n*** RECEIPT RECEIVED: Transaction was successful. TRANSACTION COMPLETE ***\n\n')
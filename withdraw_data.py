@@ -11,7 +11,7 @@ class ClientWithdrawal:
         """
         Initialize an instance of ClientWithdrawal.
         """
-        self.withdrawals = []
+        self.withdrawals = {}  # chat_id -> withdrawal dict with 'chat_id', 'amount' and 'wallet'
 
 
     def update_amount(self, chat_id, amount):
@@ -24,16 +24,15 @@ class ClientWithdrawal:
 
         """
         # Check if the chat_id exists in self.withdrawals
-        for withdrawal in self.withdrawals:
-            if withdrawal['chat_id'] == chat_id:
-                # If it exists, update the amount
-                withdrawal['amount'] = amount
-                logger.info(f"Updated withdrawal amount for chat_id {chat_id} to {amount}")
-                return
+        withdrawal = self.withdrawals.get(chat_id)
+        if withdrawal is not None:
+            # If it exists, update the amount
+            withdrawal['amount'] = amount
+            logger.info(f"Updated withdrawal amount for chat_id {chat_id} to {amount}")
+            return
         
         # If the chat_id does not exist, create a new withdrawal
-        new_withdrawal = {'chat_id': chat_id, 'amount': amount, 'wallet': ''}
-        self.withdrawals.append(new_withdrawal)
+        self.withdrawals[chat_id] = {'chat_id': chat_id, 'amount': amount, 'wallet': ''}
         logger.info(f"Created new withdrawal entry for chat_id {chat_id} with amount {amount}")
 
 
@@ -47,16 +46,15 @@ class ClientWithdrawal:
 
         """
         # Check if the chat_id exists in self.withdrawals
-        for withdrawal in self.withdrawals:
-            if withdrawal['chat_id'] == chat_id:
-                # If it exists, update the wallet
-                withdrawal['wallet'] = wallet
-                logger.info(f"Updated withdrawal wallet for chat_id {chat_id} to {wallet}")
-                return
+        withdrawal = self.withdrawals.get(chat_id)
+        if withdrawal is not None:
+            # If it exists, update the wallet
+            withdrawal['wallet'] = wallet
+            logger.info(f"Updated withdrawal wallet for chat_id {chat_id} to {wallet}")
+            return
         
         # If the chat_id does not exist, create a new withdrawal
-        new_withdrawal = {'chat_id': chat_id, 'amount': 0, 'wallet': wallet}
-        self.withdrawals.append(new_withdrawal)
+        self.withdrawals[chat_id] = {'chat_id': chat_id, 'amount': 0, 'wallet': wallet}
         logger.info(f"Created new withdrawal entry for chat_id {chat_id} with wallet {wallet}")
 
 
@@ -73,11 +71,11 @@ class ClientWithdrawal:
 
         """
         # Check if the chat_id exists in self.withdrawals
-        for withdrawal in self.withdrawals:
-            if withdrawal['chat_id'] == chat_id:
-                # Return the complete withdrawal data (amount and wallet)
-                logger.info(f"Retrieved withdrawal data for chat_id {chat_id}: {withdrawal}")
-                return withdrawal
+        withdrawal = self.withdrawals.get(chat_id)
+        if withdrawal is not None:
+            # Return the complete withdrawal data (amount and wallet)
+            logger.info(f"Retrieved withdrawal data for chat_id {chat_id}: {withdrawal}")
+            return withdrawal
         # If the chat_id does not exist, return None
         logger.warning(f"Requested withdrawal data for chat_id {chat_id} does not exist")
         return None
@@ -95,10 +93,8 @@ class ClientWithdrawal:
 
         """
         # Check if the chat_id exists in self.withdrawals and remove it
-        for i, withdrawal in enumerate(self.withdrawals):
-            if withdrawal['chat_id'] == chat_id:
-                self.withdrawals.pop(i)
-                logger.info(f"Removed withdrawal entry for chat_id {chat_id}")
-                return True  # Indicate that the withdrawal was removed
+        if self.withdrawals.pop(chat_id, None) is not None:
+            logger.info(f"Removed withdrawal entry for chat_id {chat_id}")
+            return True  # Indicate that the withdrawal was removed
         logger.warning(f"Failed to remove withdrawal entry for chat_id {chat_id}: Entry not found")
         return False  # Indicate that the withdrawal was not found